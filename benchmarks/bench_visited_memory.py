@@ -0,0 +1,104 @@
+"""
+Compares the memory used to track URLs during a crawl.
+
+The first table compares the seen-URL structures alone: a set of strings and
+URLFingerprintSet. The second replays the URL bookkeeping of a whole crawl_pages
+run, where every crawled page links to new URLs, and compares the crawl state
+kept by the original crawler (a set of visited URL strings plus a to_visit list)
+with CrawlFrontier (seen fingerprints plus the pending URL heap). Pending URL
+strings are kept by both and are included.
+
+Usage:
+    poetry run python benchmarks/bench_visited_memory.py [url_count ...]
+"""
+import sys
+import time
+import tracemalloc
+
+from d_contact_svc.frontier import CrawlFrontier
+from d_contact_svc.urlset import URLFingerprintSet
+
+# Links to new URLs found on each crawled page during the crawl replay
+LINKS_PER_PAGE = 100
+
+
+def _urls(count: int, start: int = 0):
+    for i in range(start, start + count):
+        yield f"https://shop.example.com/category/{i % 200}/product/{i}-blue-cotton-shirt?size=m&ref=listing"
+
+
+def _fill(factory, count: int):
+    seen = factory()
+    for url in _urls(count):
+        seen.add(url)
+    return seen
+
+
+class _BaselineCrawlState:
+    # URL bookkeeping of the crawler before CrawlFrontier
+    def __init__(self, url: str):
+        self.visited = set()
+        self.to_visit = [url]
+
+    def crawl_page(self, links):
+        current_url = self.to_visit.pop(0)
+        self.visited.add(current_url)
+        # The links are new, so the original membership checks would pass
+        self.to_visit.extend(links)
+
+
+class _FrontierCrawlState:
+    def __init__(self, url: str):
+        self.frontier = CrawlFrontier(site="shop.example.com")
+        self.frontier.push(url)
+
+    def crawl_page(self, links):
+        _, depth = self.frontier.pop()
+        for link in links:
+            self.frontier.push(link, "", depth + 1)
+
+
+def _replay(factory, count: int):
+    # Crawls pages until count URLs have been discovered
+    state = factory("https://shop.example.com/")
+    for start in range(0, count, LINKS_PER_PAGE):
+        state.crawl_page(_urls(min(LINKS_PER_PAGE, count - start), start))
+    return state
+
+
+def _measure(fill, factory, count: int):
+    start = time.perf_counter()
+    fill(factory, count)
+    elapsed = time.perf_counter() - start
+
+    # URLs are generated on the fly, so only memory kept by the structure is counted
+    tracemalloc.start()
+    kept = fill(factory, count)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return retained, elapsed
+
+
+def _report(title: str, fill, structures, counts):
+    print(title)
+    print(f"{'urls':>10} {'structure':>20} {'retained MiB':>13} {'bytes/url':>10} {'seconds':>8}")
+    for count in counts:
+        for name, factory in structures:
+            retained, elapsed = _measure(fill, factory, count)
+            print(f"{count:>10} {name:>20} {retained / 2 ** 20:>13.1f} {retained / count:>10.1f} {elapsed:>8.2f}")
+    print()
+
+
+def main(counts):
+    _report("Seen URLs", _fill, (("set[str]", set), ("URLFingerprintSet", URLFingerprintSet)), counts)
+    _report(
+        f"Crawl state ({LINKS_PER_PAGE} new links per crawled page)",
+        _replay,
+        (("set + list", _BaselineCrawlState), ("CrawlFrontier", _FrontierCrawlState)),
+        counts,
+    )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000])
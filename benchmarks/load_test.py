@@ -0,0 +1,138 @@
+"""
+Measures requests/sec of the production serving mode for different worker counts.
+
+Each worker count starts the service with SERVICE_MODE=production, then sends
+concurrent /identify-email-owner requests whose contexts are all resolved by the
+local owner rules, so the load is CPU-bound service work without remote AI calls.
+
+On Linux the load generator is pinned to the first available core and the service to
+the others, so both do not compete for the same CPU. Scaling is bounded by the number
+of service cores: worker counts above it cannot add throughput, and with a single core
+the service and the load generator share it, so scaling cannot be measured at all.
+The service CPU time per request is reported next to req/s; it stays flat when adding
+workers only adds capacity, and req/s should grow with workers up to the service cores.
+
+Usage:
+    poetry run python benchmarks/load_test.py [--workers 1 2 4] [--duration 10] [--concurrency 64]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+PAYLOAD = {
+    "email_contexts": [f"Team: Person Number{i} &lt;person.number{i}@example.com&gt;, call us" for i in range(100)]
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _split_cores() -> tuple:
+    # Returns (load generator cores, service cores); None when they cannot be separated
+    if not hasattr(os, "sched_getaffinity"):
+        return None, None
+    cores = sorted(os.sched_getaffinity(0))
+    if len(cores) < 2:
+        return None, None
+    return {cores[0]}, set(cores[1:])
+
+
+def _start_service(workers: int, port: int, cores: set = None) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SERVICE_MODE="production",
+        SERVICE_HOST="127.0.0.1",
+        SERVICE_PORT=str(port),
+        WORKERS=str(workers),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "d_contact_svc.main"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        # Workers inherit the affinity of the supervisor process
+        preexec_fn=(lambda: os.sched_setaffinity(0, cores)) if cores else None,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                # Give the remaining workers time to finish starting
+                time.sleep(1 + workers * 0.5)
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Service did not start")
+
+
+async def _run_load(port: int, duration: float, concurrency: int) -> tuple:
+    url = f"http://127.0.0.1:{port}/identify-email-owner"
+    completed = 0
+    errors = 0
+    stop_at = time.monotonic() + duration
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal completed, errors
+        while time.monotonic() < stop_at:
+            response = await client.post(url, json=PAYLOAD)
+            if response.status_code == 200:
+                completed += 1
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.monotonic()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+    return completed / elapsed, completed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    client_cores, service_cores = _split_cores()
+    if service_cores:
+        os.sched_setaffinity(0, client_cores)
+        print(f"Service cores: {len(service_cores)}, load generator cores: {len(client_cores)}")
+    else:
+        print("Only one CPU core available: the service and the load generator share it, "
+              "so scaling with workers cannot be measured on this machine.")
+
+    print(f"{'workers':>8} {'req/s':>10} {'cpu ms/req':>11} {'errors':>8}")
+    for workers in args.workers:
+        port = _free_port()
+        # CPU time of the service, i.e. the supervisor and its workers once they have exited
+        cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        process = _start_service(workers, port, service_cores)
+        try:
+            requests_per_second, completed, errors = asyncio.run(_run_load(port, args.duration, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_seconds = (cpu_after.ru_utime + cpu_after.ru_stime) - (cpu_before.ru_utime + cpu_before.ru_stime)
+        cpu_ms_per_request = cpu_seconds * 1000 / completed if completed else float("nan")
+        note = ""
+        if service_cores and workers > len(service_cores):
+            note = "  (more workers than service cores)"
+        print(f"{workers:>8} {requests_per_second:>10.1f} {cpu_ms_per_request:>11.2f} {errors:>8}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""create contacts table
+
+Revision ID: 3f1c2a7d9b10
+Revises: 
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'contacts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=320), nullable=False),
+        sa.Column('owner', sa.String(length=255), nullable=True),
+        sa.Column('source_url', sa.String(length=2048), nullable=True),
+        sa.Column('site', sa.String(length=255), nullable=False),
+        sa.Column('domain', sa.String(length=255), nullable=False),
+        sa.Column('first_seen', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_seen', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email', 'site', name='uq_contacts_email_site')
+    )
+    op.create_index('ix_contacts_site_id', 'contacts', ['site', 'id'], unique=False)
+    op.create_index('ix_contacts_domain_id', 'contacts', ['domain', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_domain_id', table_name='contacts')
+    op.drop_index('ix_contacts_site_id', table_name='contacts')
+    op.drop_table('contacts')
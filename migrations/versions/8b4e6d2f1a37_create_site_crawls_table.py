@@ -0,0 +1,33 @@
+"""create site_crawls table
+
+Revision ID: 8b4e6d2f1a37
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e6d2f1a37'
+down_revision: Union[str, None] = '3f1c2a7d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Not backfilled from contacts.last_seen, which truncated crawls also refreshed;
+    # sites are answered from the store again after their next complete crawl
+    op.create_table(
+        'site_crawls',
+        sa.Column('site', sa.String(length=255), nullable=False),
+        sa.Column('crawled_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('site')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('site_crawls')
@@ -2,13 +2,18 @@ import os
 import requests
 import logging
 import re
+from typing import Optional
 from dotenv import load_dotenv
 
+from d_contact_svc.budget import Budget
+from d_contact_svc.owner_inference import infer_owner
+
 # Load environment variables
 load_dotenv()
 
 # Constants
 BATCH_SIZE = 10
+REQUEST_TIMEOUT = 10
 # API endpoint for GPT-4o-mini; can be configured via environment variable
 GPT4O_MINI_API_ENDPOINT = os.getenv("GPT4O_MINI_API_ENDPOINT", "https://api.gpt4o-mini.com/v1/identify")
 
@@ -25,18 +30,78 @@ def _batch_list(items: list, batch_size: int):
         yield items[i:i+batch_size]
 
 
-def identify_email_owners(email_contexts: list) -> list:
+def identify_email_owners(email_contexts: list, budget: Optional[Budget] = None) -> list:
     """
     Identify email owners using GPT-4o-mini API by processing the provided email contexts.
     It batches the input for optimal performance and makes secure API calls with proper error handling.
 
+    Contexts that can be resolved with local rules (role accounts such as info@ or sales@,
+    display names like "John Smith <john.smith@acme.com>" and named mailto: links) are
+    resolved in-process, and only the remaining contexts are sent to the API. The share
+    of locally resolved contexts is logged.
+
     After receiving API results (or fallback results in case of API failure), this function
     iterates through each result. For each result with a missing 'owner', it applies a regex
     to the 'email_context' field to extract a valid email address if present.
 
+    When a budget is given, each API call must be allowed by it. Contexts left once the
+    deadline passes or the AI-call limit is reached get the fallback result, and the
+    budget is marked truncated.
+
     :param email_contexts: List of email context strings
+    :param budget: Optional request budget limiting time and number of API calls
     :return: List of dictionaries where each dictionary contains the email_context and the identified owner (or None if not identified).
     """
+    results = [None] * len(email_contexts)
+    pending = []
+    for index, ctx in enumerate(email_contexts):
+        owner = infer_owner(ctx)
+        if owner:
+            results[index] = {"email_context": ctx, "owner": owner}
+        else:
+            pending.append(index)
+
+    if email_contexts:
+        resolved = len(email_contexts) - len(pending)
+        logging.info(
+            f"Resolved {resolved} of {len(email_contexts)} email contexts locally "
+            f"({resolved / len(email_contexts):.0%}), sending {len(pending)} to the API"
+        )
+
+    if pending:
+        pending_contexts = [email_contexts[index] for index in pending]
+        api_results = _identify_with_api(pending_contexts, budget)
+        for position, index in enumerate(pending):
+            if position < len(api_results):
+                results[index] = api_results[position]
+            else:
+                # The API returned fewer results than contexts sent
+                results[index] = {"email_context": email_contexts[index], "owner": None}
+
+    # Post-processing: apply regex search for missing owner emails
+    email_regex = re.compile(r'([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})')
+    for res in results:
+        if res.get("owner") is None:
+            try:
+                context = res.get("email_context", "")
+                match = email_regex.search(context)
+                if match:
+                    res["owner"] = match.group(1)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+                # In case of exception during regex extraction, leave owner as None
+    
+    return results
+
+
+def _identify_with_api(email_contexts: list, budget: Optional[Budget] = None) -> list:
+    """
+    Sends email contexts to the GPT-4o-mini API in batches.
+
+    :param email_contexts: List of email context strings
+    :param budget: Optional request budget limiting time and number of API calls
+    :return: List of result dictionaries, with owner None for contexts the API could not process
+    """
     api_key = os.getenv("GPT4O_MINI_API_KEY")
     if not api_key:
         logging.error("GPT4O_MINI_API_KEY environment variable is not set")
@@ -48,35 +113,43 @@ def identify_email_owners(email_contexts: list) -> list:
         "Content-Type": "application/json"
     }
 
-    try:
-        # Process email_contexts in batches for optimal performance
-        for batch in _batch_list(email_contexts, BATCH_SIZE):
+    # Process email_contexts in batches for optimal performance. Failures are handled per
+    # batch, so results of batches that already succeeded are kept
+    processed = 0
+    for batch in _batch_list(email_contexts, BATCH_SIZE):
+        timeout = REQUEST_TIMEOUT
+        if budget:
+            timeout = budget.request_timeout(REQUEST_TIMEOUT) if budget.take_ai_call() else None
+            if timeout is None:
+                # Out of budget: mark the contexts that were not sent with unknown owner
+                remaining = email_contexts[processed:]
+                logging.info(f"AI call budget exhausted. {len(remaining)} contexts not sent.")
+                results.extend(_unknown_owners(remaining))
+                break
+        processed += len(batch)
+        try:
             payload = {"email_contexts": batch}
-            response = requests.post(GPT4O_MINI_API_ENDPOINT, json=payload, headers=headers, timeout=10)
+            response = requests.post(GPT4O_MINI_API_ENDPOINT, json=payload, headers=headers, timeout=timeout)
             if response.status_code == 200:
                 # Expected response format: {"results": [{"email_context": <str>, "owner": <str>}, ...]}
-                data = response.json()
-                results.extend(data.get("results", []))
+                batch_results = response.json().get("results", [])[:len(batch)]
+                # Keep results aligned with the contexts if the API returned fewer of them
+                results.extend(batch_results + _unknown_owners(batch[len(batch_results):]))
             else:
                 logging.error(f"API call failed with status {response.status_code}: {response.text}")
                 # Fallback behavior: mark each context in batch with unknown owner
-                results.extend([{"email_context": ctx, "owner": None} for ctx in batch])
-    except Exception as e:
-        logging.error(e, exc_info=True)
-        # Fallback for complete failure: mark all provided contexts with unknown owner
-        results = [{"email_context": ctx, "owner": None} for ctx in email_contexts]
+                results.extend(_unknown_owners(batch))
+        except Exception as e:
+            logging.error(e, exc_info=True)
+            # Fallback for a failed batch: mark its contexts with unknown owner
+            results.extend(_unknown_owners(batch))
+            if budget and not budget.check_time():
+                # The deadline cut this call short; the remaining contexts are not sent
+                results.extend(_unknown_owners(email_contexts[processed:]))
+                break
 
-    # Post-processing: apply regex search for missing owner emails
-    email_regex = re.compile(r'([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})')
-    for res in results:
-        if res.get("owner") is None:
-            try:
-                context = res.get("email_context", "")
-                match = email_regex.search(context)
-                if match:
-                    res["owner"] = match.group(1)
-            except Exception as e:
-                logging.error(e, exc_info=True)
-                # In case of exception during regex extraction, leave owner as None
-    
     return results
+
+
+def _unknown_owners(email_contexts: list) -> list:
+    return [{"email_context": ctx, "owner": None} for ctx in email_contexts]
@@ -1,6 +1,65 @@
+import logging
+import signal
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from pydantic import BaseModel
+
+from d_contact_svc.budget import cancel_shutdown, request_shutdown
+from d_contact_svc.config import SERVICE_MODE
+from d_contact_svc.models import dispose_engine, init_engine
+
+
+def _stop_budgets_on_exit_signals() -> dict:
+    # uvicorn installs its exit handlers before the lifespan starts, and only runs the
+    # lifespan shutdown after draining requests. Chaining onto its handlers stops running
+    # crawls as soon as shutdown begins, so they finish within the graceful shutdown period.
+    # Signal handlers can only be set from the main thread
+    if threading.current_thread() is not threading.main_thread():
+        return {}
+    previous_handlers = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            continue
+
+        def handle_exit(signum, frame, previous=previous):
+            request_shutdown()
+            previous(signum, frame)
+        previous_handlers[sig] = previous
+        signal.signal(sig, handle_exit)
+    return previous_handlers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy dependencies are initialized per worker at startup, not when the app is imported
+    import bs4  # noqa: F401
+    init_engine()
+    cancel_shutdown()
+    previous_handlers = _stop_budgets_on_exit_signals()
+    logging.info("Service started")
+    yield
+    # Runs after the server has drained in-flight requests
+    for sig, handler in previous_handlers.items():
+        signal.signal(sig, handler)
+    dispose_engine()
+    logging.info("Service stopped")
 
-app = FastAPI(debug=True)
+
+app = FastAPI(debug=SERVICE_MODE != "production", lifespan=lifespan)
+
+
+class HealthResponse(BaseModel):
+    status: str
+
+
+# Endpoints declare response models, so FastAPI (0.130 and later) serializes responses
+# directly to JSON bytes with Pydantic instead of jsonable_encoder and the json module
+@app.get("/health", response_model=HealthResponse)
+def health():
+    return {"status": "ok"}
 
 # Include crawler router
 from d_contact_svc.routers import crawler
@@ -9,3 +68,7 @@ app.include_router(crawler.router)
 # Include AI Agent endpoint router
 from d_contact_svc.routers import ai_agent_endpoint
 app.include_router(ai_agent_endpoint.router)
+
+# Include contacts router
+from d_contact_svc.routers import contacts
+app.include_router(contacts.router)
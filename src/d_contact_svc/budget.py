@@ -0,0 +1,110 @@
+import threading
+import time
+from typing import Optional
+
+# Set when the service starts shutting down. Every budget then refuses further work, so
+# running requests stop early and return partial results within the graceful shutdown period
+_shutdown = threading.Event()
+
+
+def request_shutdown() -> None:
+    """
+    Makes all budgets refuse further work, so running requests return truncated results.
+    """
+    _shutdown.set()
+
+
+def cancel_shutdown() -> None:
+    """
+    Lets budgets accept work again, e.g. when the app is started again in the same process.
+    """
+    _shutdown.clear()
+
+
+class Budget:
+    """
+    Time, page and AI-call limits shared by all stages of one request.
+
+    Stages ask the budget before each unit of work (a page fetch, an AI call) and stop
+    when it is refused. Once any work has been refused the budget is marked truncated,
+    so the caller can flag its results as partial. All work is refused once the service
+    is shutting down (see request_shutdown).
+    """
+
+    def __init__(
+        self,
+        time_limit: Optional[float] = None,
+        max_pages: Optional[int] = None,
+        max_ai_calls: Optional[int] = None,
+    ):
+        """
+        :param time_limit: Seconds from now until the deadline, or None for no deadline
+        :param max_pages: Maximum number of pages to fetch, or None for no limit
+        :param max_ai_calls: Maximum number of AI service calls, or None for no limit
+        """
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.max_pages = max_pages
+        self.max_ai_calls = max_ai_calls
+        self.pages_used = 0
+        self.ai_calls_used = 0
+        self.truncated = False
+
+    def remaining_time(self) -> Optional[float]:
+        """
+        Returns the seconds left until the deadline, or None if there is no deadline.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check_time(self) -> bool:
+        """
+        Returns True if the deadline has not passed yet and the service is not shutting down,
+        and marks the budget truncated otherwise.
+        """
+        if _shutdown.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline):
+            self.truncated = True
+            return False
+        return True
+
+    def take_page(self) -> bool:
+        """
+        Reserves one page fetch. Returns False if the deadline passed or no pages are left.
+        """
+        if not self.check_time():
+            return False
+        if self.max_pages is not None and self.pages_used >= self.max_pages:
+            self.truncated = True
+            return False
+        self.pages_used += 1
+        return True
+
+    def take_ai_call(self) -> bool:
+        """
+        Reserves one AI service call. Returns False if the deadline passed or no calls are left.
+        """
+        if not self.check_time():
+            return False
+        if self.max_ai_calls is not None and self.ai_calls_used >= self.max_ai_calls:
+            self.truncated = True
+            return False
+        self.ai_calls_used += 1
+        return True
+
+    def request_timeout(self, default: float) -> Optional[float]:
+        """
+        Returns the timeout for a network request: the default, capped by the time left.
+
+        Returns None, and marks the budget truncated, if no time is left or the service is
+        shutting down. requests rejects a timeout of 0, so callers must not send the request
+        in that case.
+        """
+        if not self.check_time():
+            return None
+        remaining = self.remaining_time()
+        if remaining is None:
+            return default
+        if remaining <= 0:
+            self.truncated = True
+            return None
+        return min(default, remaining)
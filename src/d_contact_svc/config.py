@@ -4,4 +4,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
-SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
\ No newline at end of file
+SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
+
+# Database connection pool settings (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# Serving mode: "development" runs a single debug process, "production" runs WORKERS
+# processes with uvloop/httptools when installed
+SERVICE_MODE = os.getenv("SERVICE_MODE", "development")
+SERVICE_HOST = os.getenv("SERVICE_HOST", "0.0.0.0")
+WORKERS = int(os.getenv("WORKERS", os.cpu_count() or 1))
+# Seconds to wait for in-flight requests on shutdown. Running crawls are told to stop when
+# shutdown begins and return partial results, so they finish within this period
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 60))
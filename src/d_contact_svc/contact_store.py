@@ -0,0 +1,179 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from d_contact_svc.models import Contact, SiteCrawl
+
+# Number of rows written per INSERT statement
+UPSERT_BATCH_SIZE = 500
+# Maximum number of contacts returned per page by find_contacts
+MAX_PAGE_SIZE = 1000
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _prepare_rows(contacts: List[Dict[str, Optional[str]]], now: datetime) -> List[dict]:
+    # Merge contacts with the same (email, site) so a batch never updates a row twice
+    rows: Dict[Tuple[str, str], dict] = {}
+    for contact in contacts:
+        email = contact["email"].strip().lower()
+        site = contact["site"].lower()
+        row = rows.get((email, site))
+        if row is None:
+            rows[(email, site)] = {
+                "email": email,
+                "owner": contact.get("owner"),
+                "source_url": contact.get("source_url"),
+                "site": site,
+                "domain": email.rsplit("@", 1)[-1],
+                "first_seen": now,
+                "last_seen": now,
+            }
+        elif row["owner"] is None:
+            row["owner"] = contact.get("owner")
+    return list(rows.values())
+
+
+def _upsert_batch(db: Session, rows: List[dict]) -> None:
+    dialect_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(Contact).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Contact.email, Contact.site],
+            set_={
+                "owner": func.coalesce(statement.excluded.owner, Contact.owner),
+                "source_url": statement.excluded.source_url,
+                "last_seen": statement.excluded.last_seen,
+            },
+        )
+        db.execute(statement)
+        return
+
+    # Other databases: look up the existing rows of the batch, then bulk insert and bulk update
+    emails = {row["email"] for row in rows}
+    existing = {
+        (email, site): (contact_id, owner)
+        for contact_id, email, site, owner in db.execute(
+            select(Contact.id, Contact.email, Contact.site, Contact.owner).where(Contact.email.in_(emails))
+        )
+    }
+    new_rows = [row for row in rows if (row["email"], row["site"]) not in existing]
+    updates = []
+    for row in rows:
+        match = existing.get((row["email"], row["site"]))
+        if match:
+            contact_id, owner = match
+            updates.append({
+                "id": contact_id,
+                "owner": row["owner"] if row["owner"] is not None else owner,
+                "source_url": row["source_url"],
+                "last_seen": row["last_seen"],
+            })
+    if new_rows:
+        db.execute(insert(Contact), new_rows)
+    if updates:
+        db.execute(update(Contact), updates)
+
+
+def _record_site_crawl(db: Session, site: str, now: datetime) -> None:
+    dialect_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(SiteCrawl).values(site=site, crawled_at=now)
+        db.execute(statement.on_conflict_do_update(index_elements=[SiteCrawl.site], set_={"crawled_at": now}))
+    else:
+        db.merge(SiteCrawl(site=site, crawled_at=now))
+
+
+def upsert_contacts(
+    db: Session,
+    contacts: List[Dict[str, Optional[str]]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+    crawled_site: Optional[str] = None,
+) -> int:
+    """
+    Inserts or updates contacts in batches and commits them.
+
+    New contacts get first_seen and last_seen set to now. Known contacts, identified by
+    email and site, get last_seen and source_url refreshed, and their owner updated
+    when a new one was identified.
+
+    :param db: Database session
+    :param contacts: Dictionaries with keys 'email', 'site', 'owner' and 'source_url'
+    :param batch_size: Number of rows written per statement
+    :param crawled_site: Site whose complete crawl found the contacts. The crawl is recorded
+        in the same transaction, so find_recent_site_contacts answers for the site
+    :return: Number of distinct contacts written
+    """
+    now = datetime.now(timezone.utc)
+    rows = _prepare_rows(contacts, now)
+    try:
+        for i in range(0, len(rows), batch_size):
+            _upsert_batch(db, rows[i:i + batch_size])
+        if crawled_site:
+            _record_site_crawl(db, crawled_site.lower(), now)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    logging.info(f"Stored {len(rows)} contacts")
+    return len(rows)
+
+
+def find_contacts(
+    db: Session,
+    domain: Optional[str] = None,
+    email: Optional[str] = None,
+    site: Optional[str] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[Contact]:
+    """
+    Looks up stored contacts, ordered by id, using keyset pagination.
+
+    :param db: Database session
+    :param domain: Only return contacts whose email belongs to this domain
+    :param email: Only return contacts with this email
+    :param site: Only return contacts found on this site
+    :param after_id: Only return contacts with an id greater than this cursor
+    :param limit: Maximum number of contacts to return
+    :return: List of contacts
+    """
+    query = select(Contact)
+    if domain:
+        query = query.where(Contact.domain == domain.lower())
+    if email:
+        query = query.where(Contact.email == email.strip().lower())
+    if site:
+        query = query.where(Contact.site == site.lower())
+    if after_id is not None:
+        query = query.where(Contact.id > after_id)
+    query = query.order_by(Contact.id).limit(min(limit, MAX_PAGE_SIZE))
+    return list(db.scalars(query))
+
+
+def find_recent_site_contacts(db: Session, site: str, max_age: int) -> List[Contact]:
+    """
+    Returns the contacts of a site if it was completely crawled within the last max_age seconds.
+
+    Crawls cut short by their budget are not recorded, so their partial results are
+    not served as a fresh answer.
+
+    :param db: Database session
+    :param site: Site network location
+    :param max_age: Maximum age of the last crawl in seconds
+    :return: List of contacts, empty if the site was not crawled recently
+    """
+    site = site.lower()
+    crawled_at = db.scalar(select(SiteCrawl.crawled_at).where(SiteCrawl.site == site))
+    if crawled_at is None:
+        return []
+    # SQLite returns naive datetimes for timezone-aware columns
+    if crawled_at.tzinfo is None:
+        crawled_at = crawled_at.replace(tzinfo=timezone.utc)
+    if crawled_at < datetime.now(timezone.utc) - timedelta(seconds=max_age):
+        return []
+    return list(db.scalars(select(Contact).where(Contact.site == site).order_by(Contact.id)))
@@ -1,81 +1,291 @@
+import gzip
+import io
 import logging
 import time
-from typing import List, Set
-from urllib.parse import urljoin, urlparse
+import xml.etree.ElementTree as ET
+from typing import Dict, List, NamedTuple, Optional, Set
+from urllib.parse import urldefrag, urljoin, urlparse
 from urllib.robotparser import RobotFileParser
 
 import requests
-from bs4 import BeautifulSoup
 
+from d_contact_svc.budget import Budget
+from d_contact_svc.email_extractor import extract_emails
+from d_contact_svc.fingerprint import SimHashIndex, content_digest, page_text, simhash
+from d_contact_svc.frontier import CrawlFrontier
 
-def crawl_website(url: str) -> List[str]:
+# Upper bound on URLs taken from sitemaps, so huge sitemaps do not flood the frontier
+MAX_SITEMAP_URLS = 1000
+# Upper bound on sitemap documents fetched per sitemap, as an index may list thousands of children
+MAX_SITEMAP_DOCUMENTS = 10
+# Upper bound on the uncompressed size of a sitemap document, as set by the sitemaps protocol
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+# Timeout in seconds for a single HTTP request
+REQUEST_TIMEOUT = 10
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class CrawledPage(NamedTuple):
+    url: str
+    html: str
+    # Emails extracted while crawling, or None if the crawler did not extract them
+    emails: Optional[List[Dict[str, str]]] = None
+
+
+def _sitemap_xml(content: bytes) -> bytes:
+    # Sitemaps may be served gzipped (sitemap.xml.gz) without a Content-Encoding header,
+    # in which case requests does not decompress them
+    if not content.startswith(_GZIP_MAGIC):
+        return content
+    with gzip.GzipFile(fileobj=io.BytesIO(content)) as f:
+        xml = f.read(MAX_SITEMAP_BYTES + 1)
+    if len(xml) > MAX_SITEMAP_BYTES:
+        raise ValueError(f"Sitemap exceeds {MAX_SITEMAP_BYTES} bytes")
+    return xml
+
+
+def fetch_sitemap_urls(
+    sitemap_url: str,
+    max_urls: int = MAX_SITEMAP_URLS,
+    budget: Optional[Budget] = None,
+    max_documents: int = MAX_SITEMAP_DOCUMENTS,
+) -> List[str]:
+    """
+    Fetches page URLs listed in a sitemap. Nested sitemap indexes are followed one level deep.
+    Gzipped sitemaps are decompressed.
+
+    Args:
+        sitemap_url (str): URL of the sitemap.xml document.
+        max_urls (int): Maximum number of URLs to return.
+        max_documents (int): Maximum number of sitemap documents to fetch, including the index.
+        budget (Optional[Budget]): Request budget limiting the sitemap fetches. Each fetched
+            sitemap document is charged as one page.
+
+    Returns:
+        List[str]: Page URLs listed in the sitemap, or an empty list if it cannot be read.
+    """
+    urls: List[str] = []
+    pending = [(sitemap_url, 0)]
+    fetched = 0
+    while pending and len(urls) < max_urls and fetched < max_documents:
+        current_url, level = pending.pop(0)
+        if budget and not budget.take_page():
+            break
+        timeout = budget.request_timeout(REQUEST_TIMEOUT) if budget else REQUEST_TIMEOUT
+        if timeout is None:
+            break
+        try:
+            fetched += 1
+            response = requests.get(current_url, timeout=timeout)
+            response.raise_for_status()
+            # Parse the raw bytes, so the encoding declared by the document is used
+            root = ET.fromstring(_sitemap_xml(response.content))
+        except Exception as e:
+            logging.info(f"Could not read sitemap {current_url}: {e}")
+            continue
+
+        is_index = root.tag.endswith("sitemapindex")
+        for element in root.iter():
+            if not element.tag.endswith("loc") or not element.text:
+                continue
+            loc = element.text.strip()
+            if is_index:
+                if level == 0 and fetched + len(pending) < max_documents:
+                    pending.append((loc, level + 1))
+            elif len(urls) < max_urls:
+                urls.append(loc)
+    return urls
+
+
+def crawl_pages(
+    url: str,
+    skip_duplicates: bool = True,
+    follow_near_duplicates: bool = False,
+    use_sitemap: bool = False,
+    max_emails: Optional[int] = None,
+    max_pages_without_new_email: Optional[int] = None,
+    budget: Optional[Budget] = None,
+) -> List[CrawledPage]:
     """
     Crawls the website starting from the given URL.
     Retrieves HTML content from pages, extracts links, respects robots.txt rules,
     handles pagination by following 'next' links, and avoids duplicate crawling.
 
+    Links are visited best-first: URLs whose path or link text suggests a contact,
+    about, team or imprint page are crawled before others, and deeper or off-site
+    URLs are crawled last. The crawl can be seeded from the site's sitemaps and
+    stopped early once enough emails have been found.
+
+    Pages are fingerprinted by their content. Pages whose content exactly matches
+    an already crawled page are dropped, and pages that are near-duplicates of an
+    already crawled page (e.g. paginated listings or faceted URLs) are kept without
+    expanding their links, unless follow_near_duplicates is set.
+
     Args:
         url (str): The starting URL for crawling.
+        skip_duplicates (bool): Drop pages whose content exactly matches a crawled page.
+        follow_near_duplicates (bool): Expand links found on near-duplicate pages. When set,
+            pages are not SimHash-fingerprinted at all.
+        use_sitemap (bool): Seed the frontier with URLs from sitemap.xml and robots.txt sitemaps.
+        max_emails (Optional[int]): Stop once this many unique emails have been found.
+        max_pages_without_new_email (Optional[int]): Stop after this many consecutive
+            pages without a new email.
+        budget (Optional[Budget]): Request budget limiting the crawl time and number of
+            fetched pages, sitemap documents included. It is marked truncated if the crawl
+            stops before the frontier is empty.
 
     Returns:
-        List[str]: A list of HTML content strings from the crawled pages.
+        List[CrawledPage]: The URL and HTML content of the crawled pages. When an early
+            termination policy is set, the emails extracted from each page are included.
     """
+    # bs4 is imported on first use (warmed up in the app lifespan) to keep worker startup fast
+    from bs4 import BeautifulSoup
+
     start_time = time.time()
     global_timeout = 1800  # 30 minutes in seconds
-    visited: Set[str] = set()
-    html_contents: List[str] = []
-    to_visit = [url]
+    pages: List[CrawledPage] = []
+    seen_digests: Set[str] = set()
+    near_duplicates = SimHashIndex()
+    track_emails = max_emails is not None or max_pages_without_new_email is not None
+    found_emails: Set[str] = set()
+    pages_without_new_email = 0
 
-    # Prepare robots.txt parser
     parsed = urlparse(url)
+    frontier = CrawlFrontier(site=parsed.netloc)
+    frontier.push(url)
+
+    # Prepare robots.txt parser
     base_url = f"{parsed.scheme}://{parsed.netloc}"
     robots_url = urljoin(base_url, "robots.txt")
+    # robots.txt is fetched with requests, as RobotFileParser.read() has no timeout
     rp = RobotFileParser()
+    timeout = budget.request_timeout(REQUEST_TIMEOUT) if budget else REQUEST_TIMEOUT
     try:
-        rp.set_url(robots_url)
-        rp.read()
+        if timeout is None:
+            raise TimeoutError("Request budget exhausted before fetching robots.txt")
+        response = requests.get(robots_url, timeout=timeout)
+        if response.status_code in (401, 403):
+            rp.disallow_all = True
+        elif 400 <= response.status_code < 500:
+            rp.allow_all = True
+        else:
+            response.raise_for_status()
+            rp.parse(response.text.splitlines())
     except Exception as e:
         logging.error(e, exc_info=True)
         # If robots.txt cannot be fetched, assume allow crawling
         rp = None
 
-    while to_visit:
+    if use_sitemap:
+        sitemap_urls = [urljoin(base_url, "sitemap.xml")]
+        robots_sitemaps = getattr(rp, "site_maps", None)
+        if robots_sitemaps:
+            sitemap_urls.extend(robots_sitemaps() or [])
+        # Sitemap documents are charged to the page budget, but may use at most half of
+        # the pages left, so the start page and the pages they point to are still crawled
+        documents_left = None
+        if budget and budget.max_pages is not None:
+            documents_left = (budget.max_pages - budget.pages_used) // 2
+        for sitemap_url in dict.fromkeys(sitemap_urls):
+            max_documents = MAX_SITEMAP_DOCUMENTS
+            if documents_left is not None:
+                max_documents = min(max_documents, documents_left)
+                if max_documents <= 0:
+                    logging.info("Page budget too small to fetch more sitemaps.")
+                    break
+            pages_used = budget.pages_used if budget else 0
+            for page_url in fetch_sitemap_urls(sitemap_url, budget=budget, max_documents=max_documents):
+                frontier.push(page_url, depth=1)
+            if documents_left is not None:
+                documents_left -= budget.pages_used - pages_used
+
+    while frontier:
         # Enforce global timeout
         if time.time() - start_time > global_timeout:
             logging.error("Global timeout reached. Stopping crawler.")
+            if budget:
+                budget.truncated = True
             break
 
-        current_url = to_visit.pop(0)
-        if current_url in visited:
-            continue
+        # Enforce early termination policy
+        if max_emails is not None and len(found_emails) >= max_emails:
+            logging.info(f"Found {len(found_emails)} emails. Stopping crawler.")
+            break
+        if max_pages_without_new_email is not None and pages_without_new_email >= max_pages_without_new_email:
+            logging.info(f"No new emails in the last {pages_without_new_email} pages. Stopping crawler.")
+            break
+
+        current_url, depth = frontier.pop()
 
         # Check robots.txt if available
         if rp and not rp.can_fetch("*", current_url):
             logging.info(f"Disallowed by robots.txt: {current_url}")
-            visited.add(current_url)
             continue
 
+        # Enforce the request budget
+        if budget and not budget.take_page():
+            logging.info(f"Crawl budget exhausted after {budget.pages_used} pages. Stopping crawler.")
+            break
+
+        timeout = budget.request_timeout(REQUEST_TIMEOUT) if budget else REQUEST_TIMEOUT
+        if timeout is None:
+            logging.info("Time budget exhausted. Stopping crawler.")
+            break
+
         try:
-            response = requests.get(current_url, timeout=10)
+            response = requests.get(current_url, timeout=timeout)
             response.raise_for_status()
             html = response.text
-            html_contents.append(html)
-            visited.add(current_url)
+            pages_without_new_email += 1
 
             soup = BeautifulSoup(html, "html.parser")
-            # Extract all links from <a> tags
-            for link in soup.find_all("a", href=True):
-                href = link['href']
-                full_url = urljoin(current_url, href)
-                if full_url in visited or full_url in to_visit:
+
+            is_near_duplicate = False
+            if skip_duplicates:
+                text = page_text(soup)
+                digest = content_digest(text)
+                if digest in seen_digests:
+                    logging.info(f"Skipping duplicate page: {current_url}")
                     continue
-                # Check for pagination hints: link text containing 'next' or rel attribute
-                if 'next' in link.text.lower() or ('rel' in link.attrs and 'next' in link.attrs['rel']):
-                    to_visit.append(full_url)
-                else:
-                    to_visit.append(full_url)
+                seen_digests.add(digest)
+                if not follow_near_duplicates:
+                    fingerprint = simhash(text)
+                    is_near_duplicate = near_duplicates.find(fingerprint) is not None
+                    near_duplicates.add(fingerprint)
+
+            if track_emails:
+                extracted = extract_emails(html)
+                pages.append(CrawledPage(current_url, html, extracted))
+                new_emails = {result["email"] for result in extracted} - found_emails
+                if new_emails:
+                    found_emails |= new_emails
+                    pages_without_new_email = 0
+            else:
+                pages.append(CrawledPage(current_url, html))
+
+            if is_near_duplicate and not follow_near_duplicates:
+                logging.info(f"Not expanding links of near-duplicate page: {current_url}")
+                continue
+
+            # Extract all links from <a> tags, including pagination ('next') links
+            for link in soup.find_all("a", href=True):
+                full_url = urldefrag(urljoin(current_url, link['href']))[0]
+                frontier.push(full_url, link.get_text(" "), depth + 1)
         except Exception as e:
             logging.error(e, exc_info=True)
-            visited.add(current_url)
 
-    return html_contents
+    return pages
+
+
+def crawl_website(url: str, **options) -> List[str]:
+    """
+    Crawls the website starting from the given URL. See crawl_pages for the available options.
+
+    Args:
+        url (str): The starting URL for crawling.
+
+    Returns:
+        List[str]: A list of HTML content strings from the crawled pages.
+    """
+    return [page.html for page in crawl_pages(url, **options)]
@@ -0,0 +1,147 @@
+import hashlib
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Number of bits in a SimHash fingerprint
+SIMHASH_BITS = 64
+# Pages whose fingerprints differ in at most this many bits are near-duplicates
+NEAR_DUPLICATE_DISTANCE = 3
+# Number of consecutive tokens hashed together as one SimHash feature
+SHINGLE_SIZE = 3
+# Large pages are fingerprinted from the features with the smallest hashes. The sample
+# is the same for identical features, so similar pages keep similar fingerprints
+MAX_FEATURES = 4096
+
+_TOKEN_REGEX = re.compile(r"\w+")
+
+
+def page_text(soup) -> str:
+    """
+    Builds the text used to fingerprint a parsed page.
+
+    The visible text is combined with the link targets of the page, so two pages
+    that read the same but point to different places (or to different mailto:
+    addresses) are not treated as duplicates.
+
+    :param soup: BeautifulSoup document of the page
+    :return: Normalized page text
+    """
+    parts = [soup.get_text(" ")]
+    parts.extend(link["href"] for link in soup.find_all("a", href=True))
+    return " ".join(" ".join(parts).lower().split())
+
+
+def content_digest(text: str) -> str:
+    """
+    Returns an exact-match digest of the given page text.
+
+    :param text: Normalized page text
+    :return: Hex digest string
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _shingles(tokens: List[str], size: int) -> Iterable[str]:
+    if len(tokens) <= size:
+        yield " ".join(tokens)
+        return
+    for i in range(len(tokens) - size + 1):
+        yield " ".join(tokens[i:i + size])
+
+
+# Each bit of a feature hash gets its own counter lane in one large integer, so the
+# per-bit counts of all features are summed with a handful of integer additions
+_LANE_BITS = 32
+_LANE_MASK = (1 << _LANE_BITS) - 1
+# _BYTE_LANES[i][b] spreads the bits of byte value b at byte position i over their lanes
+_BYTE_LANES = [
+    [
+        sum(1 << ((position * 8 + bit) * _LANE_BITS) for bit in range(8) if value >> bit & 1)
+        for value in range(256)
+    ]
+    for position in range(SIMHASH_BITS // 8)
+]
+
+
+def simhash(text: str) -> int:
+    """
+    Computes a 64-bit SimHash fingerprint of the given text.
+
+    Similar texts produce fingerprints with a small Hamming distance, which makes
+    the fingerprint suitable for near-duplicate detection.
+
+    :param text: Normalized page text
+    :return: Fingerprint as an integer
+    """
+    weights: Dict[int, int] = {}
+    for shingle in _shingles(_TOKEN_REGEX.findall(text), SHINGLE_SIZE):
+        feature = _feature_hash(shingle)
+        weights[feature] = weights.get(feature, 0) + 1
+    features = weights if len(weights) <= MAX_FEATURES else heapq.nsmallest(MAX_FEATURES, weights)
+
+    lanes = 0
+    total_weight = 0
+    for feature in features:
+        weight = weights[feature]
+        spread = 0
+        for position, table in enumerate(_BYTE_LANES):
+            spread |= table[feature >> (position * 8) & 0xFF]
+        lanes += spread * weight
+        total_weight += weight
+
+    # A bit is set when the features having it outweigh the features not having it
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if 2 * (lanes >> (bit * _LANE_BITS) & _LANE_MASK) > total_weight:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """
+    Returns the number of differing bits between two fingerprints.
+    """
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Index of SimHash fingerprints supporting near-duplicate lookups.
+
+    Fingerprints are split into max_distance + 1 bands. Two fingerprints within
+    max_distance bits of each other must agree exactly on at least one band, so
+    only fingerprints sharing a band are compared instead of the whole index.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        width = SIMHASH_BITS // band_count
+        self._bands = []
+        for i in range(band_count):
+            start = i * width
+            end = SIMHASH_BITS if i == band_count - 1 else start + width
+            self._bands.append((start, (1 << (end - start)) - 1))
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """
+        Returns an indexed fingerprint within max_distance of the given one, or None.
+        """
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            for candidate in buckets.get(fingerprint >> shift & mask, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return candidate
+        return None
+
+    def add(self, fingerprint: int) -> None:
+        """
+        Adds a fingerprint to the index.
+        """
+        for (shift, mask), buckets in zip(self._bands, self._buckets):
+            buckets.setdefault(fingerprint >> shift & mask, []).append(fingerprint)
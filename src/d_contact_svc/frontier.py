@@ -0,0 +1,162 @@
+import heapq
+import re
+from array import array
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from d_contact_svc.urlset import URLFingerprintSet
+
+# Words in a URL path or link text that point to pages likely listing contact emails
+CONTACT_KEYWORDS = {
+    "contact": 10,
+    "kontakt": 10,
+    "impressum": 9,
+    "imprint": 9,
+    "team": 7,
+    "about": 6,
+    "people": 6,
+    "staff": 6,
+    "leadership": 5,
+    "management": 5,
+    "legal": 4,
+    "company": 3,
+    "support": 3,
+}
+# Words pointing to pages that are numerous and rarely list contacts
+LOW_VALUE_KEYWORDS = {
+    "blog": 3,
+    "news": 3,
+    "tag": 3,
+    "category": 3,
+    "archive": 3,
+    "search": 3,
+    "product": 2,
+    "cart": 4,
+    "login": 4,
+}
+DEPTH_PENALTY = 1.0
+OFFSITE_PENALTY = 20.0
+
+# Scores are rounded to 1 / _SCORE_SCALE to group pending URLs into buckets
+_SCORE_SCALE = 1000
+# Bucket entries pack the URL index and the depth into one unsigned 64-bit value
+_DEPTH_BITS = 8
+_MAX_DEPTH = (1 << _DEPTH_BITS) - 1
+# Consumed bucket entries are released once they are more than half of a bucket of at least this size
+_COMPACT_SIZE = 1024
+
+_WORD_REGEX = re.compile(r"[a-z]+")
+
+
+def score_url(url: str, anchor_text: str = "", depth: int = 0, site: Optional[str] = None) -> float:
+    """
+    Scores how likely a URL leads to contact information. Higher is better.
+
+    :param url: Absolute URL to score
+    :param anchor_text: Text of the link pointing to the URL
+    :param depth: Number of links followed from the start URL
+    :param site: Network location of the crawled site; other sites are penalized
+    :return: Priority score
+    """
+    parsed = urlparse(url)
+    path_words = set(_WORD_REGEX.findall(unquote(parsed.path + " " + parsed.query).lower()))
+    anchor_words = set(_WORD_REGEX.findall(anchor_text.lower()))
+
+    score = 0.0
+    for keyword, weight in CONTACT_KEYWORDS.items():
+        if keyword in path_words or keyword in anchor_words:
+            score += weight
+    for keyword, weight in LOW_VALUE_KEYWORDS.items():
+        if keyword in path_words:
+            score -= weight
+    # Dated paths such as /2021/05/ are usually blog or news archives
+    if re.search(r"/(19|20)\d{2}/", parsed.path):
+        score -= 3
+
+    score -= depth * DEPTH_PENALTY
+    if site and parsed.netloc != site:
+        score -= OFFSITE_PENALTY
+    return score
+
+
+class CrawlFrontier:
+    """
+    Priority queue of URLs to crawl, ordered by score_url.
+
+    URLs with equal scores are returned in insertion order, and every URL is only
+    accepted once. Seen URLs are tracked as fingerprints, so memory held for URLs
+    that have already been crawled does not grow with their length.
+
+    Pending URLs are kept in one FIFO bucket per (rounded) score, as 8-byte entries
+    pointing into a shared buffer of UTF-8 encoded URLs, instead of one tuple and
+    string object per URL. The buffer is released when the frontier runs empty.
+    Depths above 255 are recorded as 255.
+    """
+
+    def __init__(self, site: Optional[str] = None):
+        self.site = site
+        self._buckets: Dict[int, array] = {}
+        # Index of the next entry to pop in each bucket
+        self._heads: Dict[int, int] = {}
+        # Negated scores of the non-empty buckets, as a heap
+        self._scores: List[int] = []
+        # URL i is stored in _url_bytes[_offsets[i]:_offsets[i + 1]]
+        self._url_bytes = bytearray()
+        self._offsets = array("Q", [0])
+        self._pending = 0
+        self._seen = URLFingerprintSet()
+
+    def push(self, url: str, anchor_text: str = "", depth: int = 0) -> bool:
+        """
+        Adds a URL to the frontier.
+
+        :return: True if the URL was added, False if it was already seen or is not an HTTP URL
+        """
+        if urlparse(url).scheme not in ("http", "https") or not self._seen.add(url):
+            return False
+        score = round(score_url(url, anchor_text, depth, self.site) * _SCORE_SCALE)
+        bucket = self._buckets.get(score)
+        if bucket is None:
+            bucket = self._buckets[score] = array("Q")
+            self._heads[score] = 0
+            heapq.heappush(self._scores, -score)
+        bucket.append((len(self._offsets) - 1) << _DEPTH_BITS | min(depth, _MAX_DEPTH))
+        self._url_bytes += url.encode("utf-8")
+        self._offsets.append(len(self._url_bytes))
+        self._pending += 1
+        return True
+
+    def pop(self) -> Tuple[str, int]:
+        """
+        Removes and returns the highest scoring URL and its depth.
+        """
+        if not self._pending:
+            raise IndexError("pop from an empty frontier")
+        score = -self._scores[0]
+        bucket = self._buckets[score]
+        head = self._heads[score]
+        entry = bucket[head]
+        head += 1
+        if head == len(bucket):
+            del self._buckets[score], self._heads[score]
+            heapq.heappop(self._scores)
+        elif head >= _COMPACT_SIZE and 2 * head > len(bucket):
+            del bucket[:head]
+            self._heads[score] = 0
+        else:
+            self._heads[score] = head
+
+        index = entry >> _DEPTH_BITS
+        url = self._url_bytes[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+        self._pending -= 1
+        if not self._pending:
+            # No entry refers to the buffer anymore
+            self._url_bytes = bytearray()
+            self._offsets = array("Q", [0])
+        return url, entry & _MAX_DEPTH
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    def __len__(self) -> int:
+        return self._pending
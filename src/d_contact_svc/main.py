@@ -1,8 +1,14 @@
+import importlib.util
 import logging
 
 import uvicorn
-from d_contact_svc.app import app
-from d_contact_svc.config import SERVICE_PORT
+from d_contact_svc.config import (
+    GRACEFUL_SHUTDOWN_TIMEOUT,
+    SERVICE_HOST,
+    SERVICE_MODE,
+    SERVICE_PORT,
+    WORKERS,
+)
 
 
 # Set up logging for the application
@@ -10,11 +16,31 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
 def main():
     service_port = int(SERVICE_PORT)
-    uvicorn.run(app, host="0.0.0.0", port=service_port)
+    if SERVICE_MODE == "production":
+        loop = "uvloop" if _installed("uvloop") else "asyncio"
+        http = "httptools" if _installed("httptools") else "h11"
+        logger.info(f"Starting {WORKERS} workers (loop={loop}, http={http})")
+        # Workers import the app themselves, so it is passed as an import string
+        uvicorn.run(
+            "d_contact_svc.app:app",
+            host=SERVICE_HOST,
+            port=service_port,
+            workers=WORKERS,
+            loop=loop,
+            http=http,
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+        )
+    else:
+        from d_contact_svc.app import app
+        uvicorn.run(app, host=SERVICE_HOST, port=service_port)
 
 
 if __name__ == "__main__":
     # Entry point for the application
-    main()
\ No newline at end of file
+    main()
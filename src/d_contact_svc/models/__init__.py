@@ -1 +1,3 @@
-from .base import Base, get_db
\ No newline at end of file
+from .base import Base, dispose_engine, get_db, init_engine
+from .contact import Contact
+from .site_crawl import SiteCrawl
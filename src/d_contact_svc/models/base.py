@@ -1,19 +1,51 @@
 from sqlalchemy import Column, PrimaryKeyConstraint, String
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, Session
 
-from d_contact_svc.config import DATABASE_URL
+from d_contact_svc.config import DATABASE_URL, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_SIZE
 
 Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# Sessions are bound once the engine is created by init_engine
+SessionLocal = sessionmaker()
+_engine = None
+
+
+def _engine_options(database_url: str) -> dict:
+    # SQLite uses its own single-connection pools that take no sizing options
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def init_engine() -> Engine:
+    # Created on first use (normally in the app lifespan) so each worker process owns its pool
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
 
 
 def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
+    # Sessions come from the shared factory and borrow connections from the engine pool
+    init_engine()
+    session = SessionLocal()
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, UniqueConstraint
+
+from d_contact_svc.models.base import Base
+
+
+class Contact(Base):
+    """
+    Email contact found while crawling a site.
+
+    A contact is identified by its email and the site it was found on. Lookups by
+    site or domain are paginated by id, so each has a composite (column, id) index;
+    lookups by email use the unique (email, site) index.
+    """
+
+    __tablename__ = "contacts"
+
+    id = Column(Integer, primary_key=True)
+    email = Column(String(320), nullable=False)
+    owner = Column(String(255), nullable=True)
+    source_url = Column(String(2048), nullable=True)
+    site = Column(String(255), nullable=False)
+    domain = Column(String(255), nullable=False)
+    first_seen = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("email", "site", name="uq_contacts_email_site"),
+        Index("ix_contacts_site_id", "site", "id"),
+        Index("ix_contacts_domain_id", "domain", "id"),
+    )
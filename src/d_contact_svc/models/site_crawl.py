@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, String
+
+from d_contact_svc.models.base import Base
+
+
+class SiteCrawl(Base):
+    """
+    Time of the last complete crawl of a site.
+
+    Crawls cut short by their budget are not recorded, so the contacts of a site are
+    only answered from the store while a crawl that covered the whole site is recent.
+    """
+
+    __tablename__ = "site_crawls"
+
+    site = Column(String(255), primary_key=True)
+    crawled_at = Column(DateTime(timezone=True), nullable=False)
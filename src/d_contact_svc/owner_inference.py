@@ -0,0 +1,118 @@
+import html
+import re
+import unicodedata
+from typing import List, Optional
+
+# Shared mailboxes whose owner is a function of the organization, not a person
+ROLE_ACCOUNTS = {
+    "info": "General Inquiries",
+    "hello": "General Inquiries",
+    "contact": "General Inquiries",
+    "office": "Office",
+    "sales": "Sales",
+    "support": "Support",
+    "help": "Support",
+    "service": "Customer Service",
+    "admin": "Administration",
+    "billing": "Billing",
+    "accounts": "Accounting",
+    "accounting": "Accounting",
+    "press": "Press",
+    "media": "Press",
+    "pr": "Press",
+    "marketing": "Marketing",
+    "jobs": "Careers",
+    "careers": "Careers",
+    "hr": "Human Resources",
+    "legal": "Legal",
+    "privacy": "Privacy",
+    "webmaster": "Webmaster",
+}
+# Capitalized words that appear next to emails but are not names
+NON_NAME_WORDS = {
+    "contact", "email", "e-mail", "mail", "send", "write", "us", "our", "the", "team",
+    "info", "support", "sales", "here", "click", "phone", "tel", "fax", "address", "website",
+}
+
+_EMAIL_REGEX = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+_NAME = r"(?P<name>[^\W\d_][\w'.-]*(?:[ \t]+[^\W\d_][\w'.-]*){1,3})"
+# "John Smith <john.smith@acme.com>" or "\"John Smith\" <john.smith@acme.com>"
+_DISPLAY_NAME_REGEX = re.compile(_NAME + r"\"?\s*<\s*(?:mailto:)?(?P<email>" + _EMAIL_REGEX.pattern + r")\s*>")
+# <a href="mailto:john.smith@acme.com">John Smith</a>
+_MAILTO_REGEX = re.compile(
+    r"mailto:(?P<email>" + _EMAIL_REGEX.pattern + r")[^\"'>]*[\"'][^>]*>\s*" + _NAME + r"\s*</a>",
+    re.IGNORECASE,
+)
+
+
+def _ascii_letters(word: str) -> str:
+    # "Müller-Lüdenscheidt" -> "mullerludenscheidt"
+    folded = unicodedata.normalize("NFKD", word).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z]", "", folded.lower())
+
+
+def _local_part_spellings(words: List[str]) -> set:
+    # Common ways to build a mailbox name from a person's name, e.g. for "Jane Q. Doe":
+    # janedoe, doejane, jdoe, janed, jqdoe, janeqdoe
+    first, last = words[0], words[-1]
+    middle_initials = "".join(word[0] for word in words[1:-1])
+    return {
+        first + last,
+        last + first,
+        first[0] + last,
+        first + last[0],
+        first[0] + middle_initials + last,
+        first + middle_initials + last,
+    }
+
+
+def _name_matching_local_part(candidate: str, local_part: str) -> Optional[str]:
+    """
+    Returns the trailing words of candidate that spell the email's local part, or None.
+
+    Leading words such as "Contact" or "Sales Director" are dropped; title-case text
+    that does not match the mailbox name (button labels, company names) is rejected.
+    """
+    mailbox = _ascii_letters(local_part.split("+", 1)[0])
+    words = candidate.split()
+    for start in range(len(words) - 1):
+        name_words = words[start:]
+        if not all(word[0].isupper() and word.lower().strip(".:") not in NON_NAME_WORDS for word in name_words):
+            continue
+        letters = [_ascii_letters(word) for word in name_words]
+        if all(letters) and mailbox in _local_part_spellings(letters):
+            return " ".join(name_words)
+    return None
+
+
+def infer_owner(email_context: str) -> Optional[str]:
+    """
+    Resolves the owner of the email in a context with simple rules, without calling the AI service.
+
+    Only unambiguous contexts are resolved: the context must mention exactly one
+    email address, and that address must either be a role account (info@, sales@, ...)
+    or be accompanied by an explicit name, as a display name or mailto link text, that
+    matches the mailbox name (e.g. "Jane Doe" for jane.doe@ or jdoe@).
+
+    :param email_context: Email context string, possibly containing HTML
+    :return: The owner name, or None if the context needs the AI service
+    """
+    text = html.unescape(email_context)
+    emails = {email.lower() for email in _EMAIL_REGEX.findall(text)}
+    if len(emails) != 1:
+        return None
+    email = emails.pop()
+    local_part, domain = email.split("@", 1)
+
+    role = ROLE_ACCOUNTS.get(local_part.split("+", 1)[0])
+    if role:
+        return f"{role} ({domain})"
+
+    for regex in (_DISPLAY_NAME_REGEX, _MAILTO_REGEX):
+        for match in regex.finditer(text):
+            if match.group("email").lower() != email:
+                continue
+            name = _name_matching_local_part(match.group("name"), local_part)
+            if name:
+                return name
+    return None
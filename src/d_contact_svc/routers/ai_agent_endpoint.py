@@ -1,18 +1,28 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 from d_contact_svc.ai_agent import identify_email_owners
+from d_contact_svc.budget import Budget
 
 router = APIRouter()
 
 class EmailContextsRequest(BaseModel):
     email_contexts: List[str]
 
-@router.post("/identify-email-owner")
-async def identify_email_owner_endpoint(payload: EmailContextsRequest):
+class EmailOwner(BaseModel):
+    email_context: Optional[str] = None
+    # None when the owner could not be identified
+    owner: Optional[str] = None
+
+class EmailOwnersResponse(BaseModel):
+    results: List[EmailOwner]
+
+@router.post("/identify-email-owner", response_model=EmailOwnersResponse)
+def identify_email_owner_endpoint(payload: EmailContextsRequest):
     try:
-        results = identify_email_owners(payload.email_contexts)
+        # An unlimited budget, so the request still stops when the service shuts down
+        results = identify_email_owners(payload.email_contexts, budget=Budget())
     except Exception as e:
         # Log error internally if needed
         raise HTTPException(status_code=500, detail="Internal Server Error")
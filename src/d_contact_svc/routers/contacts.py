@@ -0,0 +1,43 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from d_contact_svc.contact_store import MAX_PAGE_SIZE, find_contacts
+from d_contact_svc.models import get_db
+
+router = APIRouter()
+
+class ContactResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    owner: Optional[str]
+    source_url: Optional[str]
+    site: str
+    domain: str
+    first_seen: datetime
+    last_seen: datetime
+
+class ContactsPage(BaseModel):
+    results: List[ContactResponse]
+    # Pass as 'after' to fetch the next page; None on the last page
+    next_cursor: Optional[int]
+
+@router.get("/contacts", response_model=ContactsPage)
+def list_contacts(
+    domain: Optional[str] = None,
+    email: Optional[str] = None,
+    site: Optional[str] = None,
+    after: Optional[int] = Query(default=None, ge=0),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """
+    Endpoint that looks up stored contacts by email domain, email or site, paginated by id.
+    """
+    contacts = find_contacts(db, domain=domain, email=email, site=site, after_id=after, limit=limit)
+    next_cursor = contacts[-1].id if len(contacts) == limit else None
+    return {"results": contacts, "next_cursor": next_cursor}
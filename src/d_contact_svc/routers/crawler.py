@@ -1,41 +1,124 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, HttpUrl
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field, HttpUrl
+from sqlalchemy.orm import Session
+from typing import List, Optional
 import logging
+import re
 
-from d_contact_svc.crawler import crawl_website
+from d_contact_svc.budget import Budget
+from d_contact_svc.crawler import crawl_pages
 from d_contact_svc.email_extractor import extract_emails
 from d_contact_svc.ai_agent import identify_email_owners
+from d_contact_svc.contact_store import find_recent_site_contacts, upsert_contacts
+from d_contact_svc.models import get_db
 
 router = APIRouter()
 
+# identify_email_owners falls back to an email address from the context when no owner
+# was identified; such owners are not stored, so they do not replace a known owner
+_EMAIL_REGEX = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+
+def _identified_owner(owner: Optional[str]) -> Optional[str]:
+    if owner is None or _EMAIL_REGEX.fullmatch(owner.strip()):
+        return None
+    return owner
+
 class CrawlRequest(BaseModel):
     url: HttpUrl
+    # Seed the crawl with URLs from the site's sitemaps
+    use_sitemap: bool = False
+    # Stop crawling once this many unique emails have been found
+    max_emails: Optional[int] = Field(default=None, ge=1)
+    # Stop crawling after this many consecutive pages without a new email
+    max_pages_without_new_email: Optional[int] = Field(default=None, ge=1)
+    # Drop pages whose content exactly matches an already crawled page
+    skip_duplicates: bool = True
+    # Expand links of near-duplicate pages (paginated listings, faceted URLs)
+    follow_near_duplicates: bool = False
+    # Answer from the contact store if the site was crawled within this many seconds
+    max_age: Optional[int] = Field(default=None, ge=0)
+    # Seconds the whole request may take; partial results are returned when it runs out
+    time_budget: Optional[float] = Field(default=None, gt=0)
+    # Maximum number of pages to fetch
+    max_pages: Optional[int] = Field(default=None, ge=1)
+    # Maximum number of calls to the AI service
+    max_ai_calls: Optional[int] = Field(default=None, ge=0)
+
+class CrawlResult(BaseModel):
+    email: Optional[str]
+    owner_name: Optional[str]
+
+class CrawlResponse(BaseModel):
+    results: List[CrawlResult]
+    # True when a budget ran out and the results are partial
+    truncated: bool
 
-@router.post("/crawl")
-async def crawl_endpoint(request: CrawlRequest):
+@router.post("/crawl", response_model=CrawlResponse)
+def crawl_endpoint(request: CrawlRequest, db: Session = Depends(get_db)):
     """
     Endpoint that crawls a given website URL, extracts emails and their contexts from the crawled HTML pages,
     identifies the email owner using an AI-driven service, and returns aggregated results.
+
+    Results are saved to the contact store. When max_age is given and the site was crawled
+    recently enough, the stored contacts are returned without crawling again.
+
+    The time, page and AI-call budgets of the request apply to all steps. When a budget
+    runs out, the remaining work is skipped and the partial results are returned with
+    'truncated' set to true.
     """
+    budget = Budget(time_limit=request.time_budget, max_pages=request.max_pages, max_ai_calls=request.max_ai_calls)
+    site = request.url.host
     try:
-        # Step 1: Crawl website to get HTML page contents
-        html_pages = crawl_website(str(request.url))
+        # Step 0: Answer repeat lookups from the contact store; if the store is
+        # unavailable the site is crawled as usual
+        if request.max_age is not None:
+            try:
+                stored = find_recent_site_contacts(db, site, request.max_age)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+                db.rollback()
+                stored = []
+            if stored:
+                results = [{"email": contact.email, "owner_name": contact.owner} for contact in stored]
+                return {"results": results, "truncated": False}
+
+        # Step 1: Crawl website to get the URL and HTML content of each page
+        pages = crawl_pages(
+            str(request.url),
+            use_sitemap=request.use_sitemap,
+            max_emails=request.max_emails,
+            max_pages_without_new_email=request.max_pages_without_new_email,
+            skip_duplicates=request.skip_duplicates,
+            follow_near_duplicates=request.follow_near_duplicates,
+            budget=budget,
+        )
 
         # Step 2: For each HTML page, extract emails and accumulate results
         extraction_results = []
-        for html in html_pages:
-            extracted = extract_emails(html)
-            extraction_results.extend(extracted)
+        for page in pages:
+            if not budget.check_time():
+                logging.info("Time budget exhausted. Skipping email extraction of remaining pages.")
+                break
+            # Reuse the extraction done by the crawler for its early termination policy
+            page_emails = page.emails if page.emails is not None else extract_emails(page.html)
+            for extracted in page_emails:
+                extracted["source_url"] = page.url
+                extraction_results.append(extracted)
 
         # If no emails are extracted, return empty results
         if not extraction_results:
-            return {"results": []}
+            return {"results": [], "truncated": budget.truncated}
 
-        # Step 3: Build a list of email contexts in the order of extraction
+        # Step 3: Drop repeated email/context pairs (e.g. the same footer on every page)
+        # and build the list of email contexts in the order of extraction
+        unique_results = {}
+        for result in extraction_results:
+            unique_results.setdefault((result["email"], result["context"]), result)
+        extraction_results = list(unique_results.values())
         email_contexts = [result["context"] for result in extraction_results]
 
         # Step 4: Identify email owners using AI for the list of email contexts
-        ai_identifications = identify_email_owners(email_contexts)
+        ai_identifications = identify_email_owners(email_contexts, budget=budget)
 
         # Step 5: Merge extraction results with identification results
         aggregated_results = []
@@ -45,7 +128,22 @@ async def crawl_endpoint(request: CrawlRequest):
                 "owner_name": identification.get("owner")
             })
 
-        return {"results": aggregated_results}
+        # Step 6: Save the contacts; a storage failure does not fail the crawl. Only a
+        # complete crawl marks the site as fresh for later max_age lookups
+        try:
+            upsert_contacts(db, [
+                {
+                    "email": result["email"],
+                    "owner": _identified_owner(result["owner_name"]),
+                    "source_url": extraction.get("source_url"),
+                    "site": site,
+                }
+                for result, extraction in zip(aggregated_results, extraction_results)
+            ], crawled_site=None if budget.truncated else site)
+        except Exception as e:
+            logging.error(e, exc_info=True)
+
+        return {"results": aggregated_results, "truncated": budget.truncated}
     except Exception as e:
         logging.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to crawl website")
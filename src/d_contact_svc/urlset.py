@@ -0,0 +1,84 @@
+import hashlib
+from array import array
+
+# Grow the table once it is more than this full, keeping linear probe sequences short
+MAX_LOAD_FACTOR = 0.6
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    Returns a non-zero 64-bit fingerprint of a URL.
+
+    :param url: URL to fingerprint
+    :return: Fingerprint as an integer
+    """
+    fingerprint = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+    # Zero marks an empty slot in URLFingerprintSet
+    return fingerprint or 1
+
+
+class URLFingerprintSet:
+    """
+    Set of URLs stored as 64-bit fingerprints in a flat open-addressing table.
+
+    Each URL costs about 8 / MAX_LOAD_FACTOR bytes, independent of its length,
+    instead of a full string object plus a hash set entry. URLs themselves cannot
+    be read back. Two different URLs share a fingerprint with negligible
+    probability (about n^2 / 2^65 for n URLs, i.e. below 1e-7 for a million URLs),
+    in which case the second one is reported as already seen.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        size = 8
+        while size * MAX_LOAD_FACTOR < capacity:
+            size *= 2
+        self._slots = array("Q", [0]) * size
+        self._mask = size - 1
+        self._count = 0
+
+    def _find_slot(self, fingerprint: int) -> int:
+        slots, mask = self._slots, self._mask
+        index = fingerprint & mask
+        while True:
+            slot = slots[index]
+            if slot == 0 or slot == fingerprint:
+                return index
+            index = (index + 1) & mask
+
+    def _grow(self) -> None:
+        old_slots = self._slots
+        self._slots = array("Q", [0]) * (len(old_slots) * 2)
+        self._mask = len(self._slots) - 1
+        for fingerprint in old_slots:
+            if fingerprint:
+                self._slots[self._find_slot(fingerprint)] = fingerprint
+
+    def add(self, url: str) -> bool:
+        """
+        Adds a URL to the set.
+
+        :param url: URL to add
+        :return: True if the URL was not in the set yet
+        """
+        fingerprint = url_fingerprint(url)
+        index = self._find_slot(fingerprint)
+        if self._slots[index]:
+            return False
+        self._slots[index] = fingerprint
+        self._count += 1
+        if self._count > len(self._slots) * MAX_LOAD_FACTOR:
+            self._grow()
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._slots[self._find_slot(url_fingerprint(url))] != 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the fingerprint table in bytes.
+        """
+        return len(self._slots) * self._slots.itemsize
@@ -5,6 +5,7 @@ import pytest
 import requests
 
 from d_contact_svc import ai_agent
+from d_contact_svc.budget import Budget
 
 
 class DummyResponse:
@@ -114,3 +115,136 @@ def test_identify_email_owners_regex_extraction(monkeypatch):
     # For the second context, no valid email, so owner remains as None
     assert results[1]['owner'] is None
     assert results[2]['owner'] == 'test.user+label@domain.co.uk'
+
+
+# Test that contexts resolved by local rules are not sent to the API
+
+def test_identify_email_owners_local_fast_path(monkeypatch):
+    sent = []
+
+    def recording_post(url, json, headers, timeout):
+        sent.extend(json.get('email_contexts', []))
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', recording_post)
+    test_contexts = [
+        'John Smith <john.smith@acme.com>',
+        'email context 1',
+        'Questions? sales@acme.com',
+        'email context 2',
+    ]
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    results = ai_agent.identify_email_owners(test_contexts)
+
+    assert sent == ['email context 1', 'email context 2']
+    assert [res['email_context'] for res in results] == test_contexts
+    assert [res['owner'] for res in results] == [
+        'John Smith', 'owner_of_email context 1', 'Sales (acme.com)', 'owner_of_email context 2'
+    ]
+
+
+# Test that no API key is needed when every context is resolved locally
+
+def test_identify_email_owners_all_local_without_api_key(monkeypatch):
+    monkeypatch.delenv('GPT4O_MINI_API_KEY', raising=False)
+    monkeypatch.setattr(requests, 'post', dummy_exception_post)
+    results = ai_agent.identify_email_owners(['info@acme.com'])
+    assert results == [{'email_context': 'info@acme.com', 'owner': 'General Inquiries (acme.com)'}]
+
+
+# Test that the AI call budget limits the number of API calls
+
+def test_identify_email_owners_ai_call_budget(monkeypatch):
+    calls = []
+
+    def counting_post(url, json, headers, timeout):
+        calls.append(json['email_contexts'])
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', counting_post)
+    test_contexts = [f'email context {i}' for i in range(25)]
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    budget = Budget(max_ai_calls=2)
+    results = ai_agent.identify_email_owners(test_contexts, budget=budget)
+
+    assert len(calls) == 2
+    assert budget.truncated
+    assert [res['email_context'] for res in results] == test_contexts
+    assert all(res['owner'] == f'owner_of_{res["email_context"]}' for res in results[:20])
+    assert all(res['owner'] is None for res in results[20:])
+
+
+# Test that the request timeout is capped by the time left
+
+def test_identify_email_owners_deadline_caps_timeout(monkeypatch):
+    timeouts = []
+
+    def recording_post(url, json, headers, timeout):
+        timeouts.append(timeout)
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', recording_post)
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    ai_agent.identify_email_owners(['email context'], budget=Budget(time_limit=3))
+    assert timeouts[0] <= 3
+
+
+# Test that a failing batch keeps the results of earlier batches
+
+def test_identify_email_owners_keeps_results_before_failed_batch(monkeypatch):
+    calls = []
+
+    def failing_third_post(url, json, headers, timeout):
+        calls.append(json['email_contexts'])
+        if len(calls) == 3:
+            raise requests.exceptions.ReadTimeout('The read timed out')
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', failing_third_post)
+    test_contexts = [f'email context {i}' for i in range(30)]
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    results = ai_agent.identify_email_owners(test_contexts, budget=Budget(time_limit=60))
+
+    assert len(calls) == 3
+    assert [res['email_context'] for res in results] == test_contexts
+    assert all(res['owner'] == f'owner_of_{res["email_context"]}' for res in results[:20])
+    assert all(res['owner'] is None for res in results[20:])
+
+
+# Test that a batch cut short by the deadline truncates the budget and stops sending
+
+def test_identify_email_owners_deadline_during_batch(monkeypatch):
+    budget = Budget(time_limit=60)
+    calls = []
+
+    def slow_post(url, json, headers, timeout):
+        calls.append(json['email_contexts'])
+        if len(calls) == 2:
+            budget.deadline = 0
+            raise requests.exceptions.ReadTimeout('The read timed out')
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', slow_post)
+    test_contexts = [f'email context {i}' for i in range(30)]
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    results = ai_agent.identify_email_owners(test_contexts, budget=budget)
+
+    assert len(calls) == 2
+    assert budget.truncated
+    assert [res['email_context'] for res in results] == test_contexts
+    assert all(res['owner'] == f'owner_of_{res["email_context"]}' for res in results[:10])
+    assert all(res['owner'] is None for res in results[10:])
+
+
+# Test that no request is sent once no time is left
+
+def test_identify_email_owners_no_time_left(monkeypatch):
+    calls = []
+
+    def counting_post(url, json, headers, timeout):
+        calls.append(timeout)
+        return dummy_success_post(url, json, headers, timeout)
+    monkeypatch.setattr(requests, 'post', counting_post)
+    monkeypatch.setattr(Budget, 'take_ai_call', lambda self: True)
+    os.environ['GPT4O_MINI_API_KEY'] = 'dummy_api_key'
+    budget = Budget(time_limit=0)
+    results = ai_agent.identify_email_owners(['email context'], budget=budget)
+
+    assert calls == []
+    assert budget.truncated
+    assert results == [{'email_context': 'email context', 'owner': None}]
@@ -4,7 +4,7 @@ import pytest
 
 def test_identify_email_owner_valid(client, monkeypatch):
     # Monkey patch the identify_email_owners function to simulate success
-    def fake_identify_email_owners(email_contexts):
+    def fake_identify_email_owners(email_contexts, **kwargs):
         return [{"email_context": ctx, "owner": f"owner_" + ctx} for ctx in email_contexts]
 
     monkeypatch.setattr("d_contact_svc.routers.ai_agent_endpoint.identify_email_owners", fake_identify_email_owners)
@@ -29,7 +29,7 @@ def test_identify_email_owner_invalid_payload(client):
 
 def test_identify_email_owner_internal_error(client, monkeypatch):
     # Simulate an internal error in the identify_email_owners function
-    def fake_identify_email_owners(email_contexts):
+    def fake_identify_email_owners(email_contexts, **kwargs):
         raise Exception("Simulated failure")
     monkeypatch.setattr("d_contact_svc.routers.ai_agent_endpoint.identify_email_owners", fake_identify_email_owners)
     payload = {"email_contexts": ["user@example.com"]}
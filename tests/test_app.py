@@ -0,0 +1,45 @@
+import signal
+import threading
+
+from fastapi.testclient import TestClient
+
+from d_contact_svc import app as app_module
+from d_contact_svc import budget as budget_module
+from d_contact_svc.budget import Budget
+from d_contact_svc.models import base
+
+# Test client is provided by conftest.py
+
+
+def test_health(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_lifespan_manages_engine(client):
+    # The client fixture runs the app lifespan, which creates the engine
+    assert base._engine is not None
+
+
+def test_engine_disposed_on_shutdown():
+    with TestClient(app_module.app):
+        assert base._engine is not None
+    assert base._engine is None
+
+
+def test_exit_signal_stops_running_budgets(monkeypatch):
+    monkeypatch.setattr(budget_module, "_shutdown", threading.Event())
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+    try:
+        previous_handlers = app_module._stop_budgets_on_exit_signals()
+        budget = Budget()
+        # uvicorn's handler still runs after the budgets are stopped
+        signal.getsignal(signal.SIGTERM)(signal.SIGTERM, None)
+        assert received == [signal.SIGTERM]
+        assert not budget.take_page()
+        assert budget.truncated
+        assert signal.SIGTERM in previous_handlers
+    finally:
+        signal.signal(signal.SIGTERM, original)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from d_contact_svc import budget as budget_module
+from d_contact_svc.budget import Budget, cancel_shutdown, request_shutdown
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_unlimited_budget():
+    budget = Budget()
+    assert all(budget.take_page() and budget.take_ai_call() for _ in range(100))
+    assert budget.remaining_time() is None
+    assert budget.request_timeout(10) == 10
+    assert not budget.truncated
+
+
+def test_deadline(clock):
+    budget = Budget(time_limit=5)
+    assert budget.remaining_time() == 5
+    clock[0] += 3
+    assert budget.request_timeout(10) == 2
+    assert budget.request_timeout(1) == 1
+    assert budget.take_page()
+    clock[0] += 2
+    assert not budget.check_time()
+    assert not budget.take_page()
+    assert not budget.take_ai_call()
+    assert budget.remaining_time() == 0
+    assert budget.truncated
+
+
+def test_request_timeout_without_time_left(clock):
+    budget = Budget(time_limit=1)
+    clock[0] += 1
+    assert budget.request_timeout(10) is None
+    assert budget.truncated
+
+
+def test_page_and_ai_call_limits():
+    budget = Budget(max_pages=2, max_ai_calls=0)
+    assert budget.take_page()
+    assert budget.take_page()
+    assert not budget.truncated
+    assert not budget.take_page()
+    assert budget.pages_used == 2
+    assert budget.truncated
+
+    budget = Budget(max_ai_calls=1)
+    assert budget.take_ai_call()
+    assert not budget.take_ai_call()
+    assert budget.truncated
+
+
+def test_shutdown_refuses_work(monkeypatch):
+    monkeypatch.setattr(budget_module, "_shutdown", threading.Event())
+    budget = Budget()
+    assert budget.take_page()
+    request_shutdown()
+    assert not budget.check_time()
+    assert not budget.take_page()
+    assert not budget.take_ai_call()
+    assert budget.request_timeout(10) is None
+    assert budget.truncated
+
+    cancel_shutdown()
+    assert Budget().take_page()
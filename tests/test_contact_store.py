@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from d_contact_svc import contact_store
+from d_contact_svc.contact_store import find_contacts, find_recent_site_contacts, upsert_contacts
+from d_contact_svc.models import Contact, SiteCrawl
+
+
+@pytest.fixture(params=["native", "generic"])
+def store_session(request, db_session, monkeypatch):
+    # Run each test with the dialect upsert and with the select-then-write fallback
+    if request.param == "generic":
+        monkeypatch.setattr(contact_store, "_UPSERT_DIALECTS", {})
+    return db_session
+
+
+def test_upsert_inserts_and_updates(store_session):
+    written = upsert_contacts(store_session, [
+        {"email": "Jane@Example.com", "owner": "Jane Doe", "source_url": "http://a.com/team", "site": "a.com"},
+        {"email": "bob@example.com", "owner": None, "source_url": "http://a.com/", "site": "a.com"},
+    ])
+    assert written == 2
+    first = store_session.query(Contact).filter_by(email="jane@example.com").one()
+    first_seen = first.first_seen
+
+    upsert_contacts(store_session, [
+        # A missing owner does not erase a known one
+        {"email": "jane@example.com", "owner": None, "source_url": "http://a.com/about", "site": "a.com"},
+        {"email": "bob@example.com", "owner": "Bob", "source_url": "http://a.com/", "site": "a.com"},
+        # The same email on another site is a separate contact
+        {"email": "jane@example.com", "owner": "Jane", "source_url": "http://b.com/", "site": "b.com"},
+    ])
+    store_session.expire_all()
+    assert store_session.query(Contact).count() == 3
+    jane = store_session.query(Contact).filter_by(email="jane@example.com", site="a.com").one()
+    assert jane.owner == "Jane Doe"
+    assert jane.source_url == "http://a.com/about"
+    assert jane.first_seen == first_seen
+    assert jane.last_seen >= first_seen
+    assert store_session.query(Contact).filter_by(email="bob@example.com").one().owner == "Bob"
+
+
+def test_upsert_merges_duplicates_within_batch(store_session):
+    written = upsert_contacts(store_session, [
+        {"email": "jane@example.com", "owner": None, "site": "a.com"},
+        {"email": "JANE@example.com", "owner": "Jane Doe", "site": "a.com"},
+    ])
+    assert written == 1
+    assert store_session.query(Contact).one().owner == "Jane Doe"
+
+
+def test_upsert_in_batches(store_session):
+    contacts = [{"email": f"user{i}@example.com", "site": "a.com"} for i in range(25)]
+    assert upsert_contacts(store_session, contacts, batch_size=10) == 25
+    assert upsert_contacts(store_session, contacts, batch_size=10) == 25
+    assert store_session.query(Contact).count() == 25
+
+
+def test_find_contacts_filters_and_pagination(store_session):
+    upsert_contacts(store_session, [
+        {"email": f"user{i}@example.com", "site": "a.com"} for i in range(5)
+    ] + [
+        {"email": "x@other.org", "site": "b.com"},
+    ])
+    assert [c.email for c in find_contacts(store_session, domain="Example.com", limit=100)] == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+    assert [c.site for c in find_contacts(store_session, email="X@other.org")] == ["b.com"]
+    assert len(find_contacts(store_session, site="a.com")) == 5
+
+    first_page = find_contacts(store_session, site="a.com", limit=2)
+    second_page = find_contacts(store_session, site="a.com", after_id=first_page[-1].id, limit=2)
+    assert [c.email for c in second_page] == ["user2@example.com", "user3@example.com"]
+
+
+def test_find_recent_site_contacts(store_session):
+    assert find_recent_site_contacts(store_session, "a.com", 3600) == []
+    upsert_contacts(store_session, [{"email": "jane@example.com", "site": "a.com"}], crawled_site="A.com")
+    assert [c.email for c in find_recent_site_contacts(store_session, "A.com", 3600)] == ["jane@example.com"]
+
+    # A recrawl of the site refreshes the crawl record
+    upsert_contacts(store_session, [{"email": "jane@example.com", "site": "a.com"}], crawled_site="a.com")
+    crawl = store_session.query(SiteCrawl).one()
+    crawl.crawled_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    store_session.commit()
+    assert find_recent_site_contacts(store_session, "a.com", 3600) == []
+
+
+def test_find_recent_site_contacts_ignores_incomplete_crawls(store_session):
+    # Contacts saved without a complete crawl (e.g. a truncated one) are stored but not served as fresh
+    upsert_contacts(store_session, [{"email": "jane@example.com", "site": "a.com"}])
+    assert store_session.query(Contact).count() == 1
+    assert find_recent_site_contacts(store_session, "a.com", 3600) == []
+
+
+def test_find_recent_site_contacts_skips_loading_stale_sites(store_session, monkeypatch):
+    upsert_contacts(
+        store_session, [{"email": f"user{i}@example.com", "site": "a.com"} for i in range(3)], crawled_site="a.com"
+    )
+    store_session.query(SiteCrawl).update({"crawled_at": datetime.now(timezone.utc) - timedelta(hours=2)})
+    store_session.commit()
+
+    # Only the crawl record is read; no contact rows are loaded
+    scalars_calls = []
+    original_scalars = store_session.scalars
+    monkeypatch.setattr(store_session, "scalars", lambda *args, **kwargs: scalars_calls.append(args) or original_scalars(*args, **kwargs))
+    assert find_recent_site_contacts(store_session, "a.com", 3600) == []
+    assert scalars_calls == []
@@ -0,0 +1,42 @@
+import pytest
+
+from d_contact_svc.contact_store import upsert_contacts
+
+# Test client is provided by conftest.py
+
+
+@pytest.fixture
+def stored_contacts(db_session):
+    upsert_contacts(db_session, [
+        {"email": f"user{i}@example.com", "owner": f"User {i}", "source_url": "http://example.com/team", "site": "example.com"}
+        for i in range(3)
+    ] + [
+        {"email": "info@other.org", "owner": None, "source_url": "http://other.org/", "site": "other.org"},
+    ])
+
+
+def test_lookup_by_domain_with_pagination(client, stored_contacts):
+    response = client.get("/contacts", params={"domain": "example.com", "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["email"] for c in data["results"]] == ["user0@example.com", "user1@example.com"]
+    assert data["results"][0]["owner"] == "User 0"
+    assert data["results"][0]["source_url"] == "http://example.com/team"
+
+    response = client.get("/contacts", params={"domain": "example.com", "limit": 2, "after": data["next_cursor"]})
+    data = response.json()
+    assert [c["email"] for c in data["results"]] == ["user2@example.com"]
+    assert data["next_cursor"] is None
+
+
+def test_lookup_by_email_and_site(client, stored_contacts):
+    data = client.get("/contacts", params={"email": "info@other.org"}).json()
+    assert [c["site"] for c in data["results"]] == ["other.org"]
+
+    data = client.get("/contacts", params={"site": "example.com"}).json()
+    assert len(data["results"]) == 3
+
+
+def test_lookup_invalid_limit(client):
+    response = client.get("/contacts", params={"limit": 0})
+    assert response.status_code == 422
@@ -1,3 +1,4 @@
+import gzip
 import time
 import logging
 import requests
@@ -5,11 +6,13 @@ from urllib.robotparser import RobotFileParser
 import pytest
 
 from d_contact_svc import crawler
+from d_contact_svc.budget import Budget
 
 class DummyResponse:
-    def __init__(self, text, status_code=200):
+    def __init__(self, text, status_code=200, content=None):
         self.text = text
         self.status_code = status_code
+        self.content = content if content is not None else text.encode("utf-8")
 
     def raise_for_status(self):
         if self.status_code >= 400:
@@ -43,6 +46,9 @@ class DummyRobotFileParser:
     def read(self):
         pass
 
+    def parse(self, lines):
+        pass
+
     def can_fetch(self, useragent, url):
         # Disallow crawling for any URL in the disallowed list
         for disallowed in self.disallowed_urls:
@@ -108,3 +114,279 @@ def test_global_timeout(monkeypatch):
     # With global timeout reached, crawler should break early
     # Depending on execution, it may have 0 or 1 page fetched
     assert len(results) <= 1
+
+
+def test_exact_duplicate_pages_skipped(monkeypatch):
+    # Different URLs serving identical content are only returned once
+    def fake_requests_get_dup(url, timeout):
+        if url.endswith("start.html"):
+            return DummyResponse("<html><body>Start <a href='a.html'>a</a> <a href='b.html'>b</a></body></html>")
+        return DummyResponse("<html><body>Same content</body></html>")
+    monkeypatch.setattr(requests, "get", fake_requests_get_dup)
+
+    results = crawler.crawl_website("http://example.com/start.html")
+    assert len(results) == 2
+
+    results = crawler.crawl_website("http://example.com/start.html", skip_duplicates=False)
+    assert len(results) == 3
+
+
+def test_near_duplicate_pages_not_expanded(monkeypatch):
+    # Paginated listing pages only differ in their page number
+    listing = " ".join(f"product {i} costs {i * 3} dollars" for i in range(80))
+
+    def fake_requests_get_listing(url, timeout):
+        page = int(url.rsplit("=", 1)[-1]) if "=" in url else 1
+        return DummyResponse(
+            f"<html><body>{listing} page {page} <a href='list?page={page + 1}'>next</a></body></html>"
+        )
+    monkeypatch.setattr(requests, "get", fake_requests_get_listing)
+
+    results = crawler.crawl_website("http://example.com/list?page=1", follow_near_duplicates=False)
+    # The first page and its first near-duplicate are kept, but the duplicate is not expanded
+    assert len(results) == 2
+
+
+SITE_PAGES = {
+    "http://example.com/": (
+        "<html><body>Home "
+        + " ".join(f"<a href='/blog/post-{i}'>Post {i}</a>" for i in range(20))
+        + " <a href='/contact'>Contact</a></body></html>"
+    ),
+    "http://example.com/contact": "<html><body>Write to sales@example.com or jane@example.com</body></html>",
+}
+
+
+def fake_site_get(url, timeout):
+    if url in SITE_PAGES:
+        return DummyResponse(SITE_PAGES[url])
+    if url.endswith("sitemap.xml"):
+        return DummyResponse(
+            "<?xml version='1.0' encoding='UTF-8'?>"
+            "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+            "<url><loc>http://example.com/team</loc></url>"
+            "</urlset>"
+        )
+    if url.endswith("/team"):
+        return DummyResponse("<html><body>Our team: bob@example.com</body></html>")
+    return DummyResponse(f"<html><body>Blog post {url}</body></html>")
+
+
+def test_contact_page_crawled_first(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    results = crawler.crawl_website("http://example.com/")
+    # The contact link is listed last on the page but is crawled right after the start page
+    assert results[1] == SITE_PAGES["http://example.com/contact"]
+    assert len(results) == 22
+
+
+def test_stop_after_max_emails(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    results = crawler.crawl_website("http://example.com/", max_emails=2)
+    assert len(results) == 2
+
+
+def test_stop_after_pages_without_new_email(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    results = crawler.crawl_website("http://example.com/", max_pages_without_new_email=3)
+    # Start page, contact page, then three blog posts without new emails
+    assert len(results) == 5
+
+
+def test_sitemap_seeding(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    results = crawler.crawl_website("http://example.com/", use_sitemap=True)
+    # The team page is only listed in the sitemap and outranks the start page
+    assert "bob@example.com" in results[0]
+    assert len(results) == 23
+
+
+def test_sitemap_fetches_charged_to_page_budget(monkeypatch):
+    fetched = []
+
+    def recording_get(url, timeout):
+        fetched.append(url)
+        if url.endswith("robots.txt"):
+            return DummyResponse("Sitemap: http://example.com/other-sitemap.xml")
+        return fake_site_get(url, timeout)
+    monkeypatch.setattr(requests, "get", recording_get)
+    monkeypatch.setattr(crawler, "RobotFileParser", RobotFileParser)
+
+    # A single page is left for the start page; no sitemap is fetched
+    budget = Budget(max_pages=1)
+    results = crawler.crawl_website("http://example.com/", use_sitemap=True, budget=budget)
+    assert fetched == ["http://example.com/robots.txt", "http://example.com/"]
+    assert len(results) == 1
+
+    # Sitemaps use at most half of the page budget, and count against it
+    fetched.clear()
+    budget = Budget(max_pages=4)
+    results = crawler.crawl_website("http://example.com/", use_sitemap=True, budget=budget)
+    assert fetched[1:3] == ["http://example.com/sitemap.xml", "http://example.com/other-sitemap.xml"]
+    assert len(results) == 2
+    assert budget.pages_used == 4
+
+
+def test_fetch_sitemap_urls_follows_index(monkeypatch):
+    def fake_get(url, timeout):
+        if url.endswith("sitemap.xml"):
+            return DummyResponse(
+                "<sitemapindex xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+                "<sitemap><loc>http://example.com/pages.xml</loc></sitemap>"
+                "</sitemapindex>"
+            )
+        return DummyResponse(
+            "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+            "<url><loc>http://example.com/a</loc></url><url><loc>http://example.com/b</loc></url>"
+            "</urlset>"
+        )
+    monkeypatch.setattr(requests, "get", fake_get)
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml") == [
+        "http://example.com/a", "http://example.com/b"
+    ]
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml", max_urls=1) == ["http://example.com/a"]
+
+
+def test_fetch_sitemap_urls_declared_encoding(monkeypatch):
+    xml = (
+        "<?xml version='1.0' encoding='ISO-8859-1'?>"
+        "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+        "<url><loc>http://example.com/\u00fcber-uns</loc></url>"
+        "</urlset>"
+    )
+    # requests guesses the wrong text encoding; the document declares its own
+    monkeypatch.setattr(requests, "get", lambda url, timeout: DummyResponse(
+        xml.encode("latin-1").decode("utf-8", "replace"), content=xml.encode("latin-1")))
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml") == ["http://example.com/\u00fcber-uns"]
+
+
+def test_fetch_sitemap_urls_gzipped(monkeypatch):
+    xml = (
+        "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+        "<url><loc>http://example.com/a</loc></url>"
+        "</urlset>"
+    )
+    monkeypatch.setattr(requests, "get", lambda url, timeout: DummyResponse(
+        "", content=gzip.compress(xml.encode("utf-8"))))
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml.gz") == ["http://example.com/a"]
+
+
+def test_fetch_sitemap_urls_invalid_document():
+    # The default fake returns HTML, which is not a sitemap
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml") == []
+
+
+def test_page_budget_truncates_crawl(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    budget = Budget(max_pages=3)
+    results = crawler.crawl_website("http://example.com/", budget=budget)
+    assert len(results) == 3
+    assert budget.truncated
+
+    # A budget that is not used up is not truncated
+    budget = Budget(max_pages=100)
+    crawler.crawl_website("http://example.com/", budget=budget)
+    assert budget.pages_used == 22
+    assert not budget.truncated
+
+
+def test_deadline_caps_request_timeout(monkeypatch):
+    timeouts = []
+
+    def recording_get(url, timeout):
+        timeouts.append(timeout)
+        return DummyResponse("<html><body>Only page</body></html>")
+    monkeypatch.setattr(requests, "get", recording_get)
+
+    crawler.crawl_website("http://example.com/", budget=Budget(time_limit=2))
+    # robots.txt and the page
+    assert len(timeouts) == 2 and all(0 < timeout <= 2 for timeout in timeouts)
+
+    budget = Budget(time_limit=0.5)
+    budget.deadline = 0
+    assert crawler.crawl_website("http://example.com/", budget=budget) == []
+    assert budget.truncated
+
+
+def test_near_duplicates_not_fingerprinted_when_followed(monkeypatch):
+    # SimHash is only needed to stop expanding near-duplicates
+    def failing_simhash(text):
+        raise AssertionError("simhash should not be computed")
+    monkeypatch.setattr(crawler, "simhash", failing_simhash)
+
+    results = crawler.crawl_website("http://example.com/page1.html", follow_near_duplicates=True)
+    assert len(results) == 2
+
+
+def test_early_stop_returns_extracted_emails(monkeypatch):
+    monkeypatch.setattr(requests, "get", fake_site_get)
+    pages = crawler.crawl_pages("http://example.com/", max_emails=2)
+    assert [page.url for page in pages] == ["http://example.com/", "http://example.com/contact"]
+    assert pages[0].emails == []
+    assert {result["email"] for result in pages[1].emails} == {"sales@example.com", "jane@example.com"}
+
+    # Without an early termination policy the crawler does not extract emails
+    pages = crawler.crawl_pages("http://example.com/")
+    assert all(page.emails is None for page in pages)
+
+
+def test_fetch_sitemap_urls_caps_documents(monkeypatch):
+    fetched = []
+
+    def fake_get(url, timeout):
+        fetched.append(url)
+        if url.endswith("sitemap.xml"):
+            return DummyResponse(
+                "<sitemapindex xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+                + "".join(f"<sitemap><loc>http://example.com/s{i}.xml</loc></sitemap>" for i in range(1000))
+                + "</sitemapindex>"
+            )
+        # Children are missing
+        return DummyResponse("", status_code=404)
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    assert crawler.fetch_sitemap_urls("http://example.com/sitemap.xml", max_documents=5) == []
+    assert len(fetched) == 5
+
+
+def test_robots_txt_fetched_with_budget_timeout(monkeypatch):
+    # The real parser is used, fed from requests.get with the budget timeout
+    monkeypatch.setattr(crawler, "RobotFileParser", RobotFileParser)
+    calls = []
+
+    def fake_get(url, timeout):
+        calls.append((url, timeout))
+        if url.endswith("robots.txt"):
+            return DummyResponse("User-agent: *\nDisallow: /private")
+        return DummyResponse(f"<html><body>{url} <a href='/private/a'>a</a> <a href='/public'>b</a></body></html>")
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    results = crawler.crawl_website("http://example.com/", budget=Budget(time_limit=5))
+    assert calls[0][0] == "http://example.com/robots.txt"
+    assert 0 < calls[0][1] <= 5
+    assert "http://example.com/private/a" not in [url for url, _ in calls]
+    assert len(results) == 2
+
+
+@pytest.mark.parametrize("status_code, expected_pages", [(403, 0), (404, 1), (500, 1)])
+def test_robots_txt_status_codes(monkeypatch, status_code, expected_pages):
+    monkeypatch.setattr(crawler, "RobotFileParser", RobotFileParser)
+
+    def fake_get(url, timeout):
+        if url.endswith("robots.txt"):
+            return DummyResponse("", status_code=status_code)
+        return DummyResponse("<html><body>Only page</body></html>")
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    # 401/403 forbid crawling, other errors allow it
+    assert len(crawler.crawl_website("http://example.com/")) == expected_pages
+
+
+def test_robots_txt_skipped_when_budget_exhausted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(requests, "get", lambda url, timeout: calls.append(url) or DummyResponse(HTML_PAGE_1))
+    budget = Budget(time_limit=1)
+    budget.deadline = 0
+    assert crawler.crawl_website("http://example.com/", budget=budget) == []
+    assert calls == []
+    assert budget.truncated
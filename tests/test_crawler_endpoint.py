@@ -1,13 +1,26 @@
+import threading
+
 import pytest
+import requests
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from d_contact_svc import budget as budget_module
+from d_contact_svc.budget import request_shutdown
+from d_contact_svc.contact_store import upsert_contacts
+from d_contact_svc.crawler import CrawledPage
+from d_contact_svc.models import Contact
 
 # The client fixture is provided in tests/conftest.py
 
 def test_crawl_success(monkeypatch, client):
-    # Monkey-patch crawl_website to return two HTML pages
-    def fake_crawl(url: str):
-        return ["<html>Email: test@example.com</html>", "<html>No email here</html>"]
-    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_website", fake_crawl)
+    # Monkey-patch crawl_pages to return two HTML pages
+    def fake_crawl(url: str, **kwargs):
+        return [
+            CrawledPage("http://example.com/contact", "<html>Email: test@example.com</html>"),
+            CrawledPage("http://example.com/", "<html>No email here</html>"),
+        ]
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
 
     # Monkey-patch extract_emails to extract email from HTML if present
     def fake_extract_emails(html: str):
@@ -17,7 +30,7 @@ def test_crawl_success(monkeypatch, client):
     monkeypatch.setattr("d_contact_svc.routers.crawler.extract_emails", fake_extract_emails)
 
     # Monkey-patch identify_email_owners to simulate owner identification based on the provided context
-    def fake_identify_email_owners(contexts: list):
+    def fake_identify_email_owners(contexts: list, **kwargs):
         results = []
         for ctx in contexts:
             results.append({"email_context": ctx, "owner": "Owner for " + ctx})
@@ -28,7 +41,10 @@ def test_crawl_success(monkeypatch, client):
     assert response.status_code == 200
     json_data = response.json()
     # Only the first HTML page returns an extracted email
-    expected = {"results": [{"email": "test@example.com", "owner_name": "Owner for Email: test@example.com"}]}
+    expected = {
+        "results": [{"email": "test@example.com", "owner_name": "Owner for Email: test@example.com"}],
+        "truncated": False
+    }
     assert json_data == expected
 
 
@@ -39,13 +55,301 @@ def test_crawl_invalid_url(client):
 
 
 def test_crawl_error(monkeypatch, client):
-    # Simulate an exception in crawl_website
-    def fake_crawl(url: str):
+    # Simulate an exception in crawl_pages
+    def fake_crawl(url: str, **kwargs):
         raise Exception("Crawling error")
-    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_website", fake_crawl)
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
 
     response = client.post("/crawl", json={"url": "http://example.com"})
     assert response.status_code == 500
     json_data = response.json()
     assert "detail" in json_data
     assert json_data["detail"] == "Failed to crawl website"
+
+
+def test_crawl_repeated_contexts_identified_once(monkeypatch, client):
+    # The same footer email on every page is only sent to the AI service once
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [CrawledPage(f"http://example.com/{i}", "<html>page</html>") for i in range(3)]
+    )
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.extract_emails",
+        lambda html: [{"email": "info@example.com", "context": "Footer: info@example.com"}]
+    )
+    calls = []
+
+    def fake_identify_email_owners(contexts: list, **kwargs):
+        calls.append(contexts)
+        return [{"email_context": ctx, "owner": "Example"} for ctx in contexts]
+    monkeypatch.setattr("d_contact_svc.routers.crawler.identify_email_owners", fake_identify_email_owners)
+
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"email": "info@example.com", "owner_name": "Example"}], "truncated": False}
+    assert calls == [["Footer: info@example.com"]]
+
+
+def test_crawl_passes_early_stop_options(monkeypatch, client):
+    received = {}
+
+    def fake_crawl(url: str, **kwargs):
+        received.update(kwargs)
+        return []
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
+
+    response = client.post(
+        "/crawl",
+        json={
+            "url": "http://example.com",
+            "use_sitemap": True,
+            "max_emails": 5,
+            "max_pages_without_new_email": 10,
+            "follow_near_duplicates": True,
+        }
+    )
+    assert response.status_code == 200
+    received.pop("budget")
+    assert received == {
+        "use_sitemap": True,
+        "max_emails": 5,
+        "max_pages_without_new_email": 10,
+        "skip_duplicates": True,
+        "follow_near_duplicates": True,
+    }
+
+    response = client.post("/crawl", json={"url": "http://example.com", "max_emails": 0})
+    assert response.status_code == 422
+
+
+def test_crawl_saves_contacts(monkeypatch, client, db_session):
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [CrawledPage("http://example.com/team", "<html>Jane: Jane@Example.com</html>")]
+    )
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.extract_emails",
+        lambda html: [{"email": "Jane@Example.com", "context": "Jane: Jane@Example.com"}]
+    )
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": "Jane Doe"} for ctx in contexts]
+    )
+
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 200
+
+    contact = db_session.query(Contact).one()
+    assert contact.email == "jane@example.com"
+    assert contact.owner == "Jane Doe"
+    assert contact.source_url == "http://example.com/team"
+    assert contact.site == "example.com"
+    assert contact.domain == "example.com"
+
+
+def test_crawl_answers_from_store(monkeypatch, client, db_session):
+    upsert_contacts(
+        db_session, [{"email": "jane@example.com", "owner": "Jane Doe", "site": "example.com"}], crawled_site="example.com"
+    )
+
+    def fake_crawl(url: str, **kwargs):
+        raise AssertionError("Site should not be crawled again")
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
+
+    response = client.post("/crawl", json={"url": "http://example.com", "max_age": 3600})
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"email": "jane@example.com", "owner_name": "Jane Doe"}], "truncated": False}
+
+    # Without max_age the site is crawled again
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 500
+
+
+def test_crawl_storage_failure_still_returns_results(monkeypatch, client):
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [CrawledPage("http://example.com/", "<html>x@example.com</html>")]
+    )
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": None} for ctx in contexts]
+    )
+
+    def failing_upsert(db, contacts, **kwargs):
+        raise Exception("Database unavailable")
+    monkeypatch.setattr("d_contact_svc.routers.crawler.upsert_contacts", failing_upsert)
+
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"email": "x@example.com", "owner_name": None}], "truncated": False}
+
+
+def test_crawl_budget_passed_and_truncated(monkeypatch, client):
+    received = {}
+
+    def fake_crawl(url: str, budget=None, **kwargs):
+        received["budget"] = budget
+        # Simulate the crawler running out of pages
+        budget.truncated = True
+        return [CrawledPage("http://example.com/", "<html>x@example.com</html>")]
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
+
+    def fake_identify_email_owners(contexts: list, budget=None):
+        assert budget is received["budget"]
+        return [{"email_context": ctx, "owner": None} for ctx in contexts]
+    monkeypatch.setattr("d_contact_svc.routers.crawler.identify_email_owners", fake_identify_email_owners)
+
+    response = client.post(
+        "/crawl",
+        json={"url": "http://example.com", "time_budget": 20, "max_pages": 5, "max_ai_calls": 1}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"email": "x@example.com", "owner_name": None}], "truncated": True}
+    budget = received["budget"]
+    assert (budget.max_pages, budget.max_ai_calls) == (5, 1)
+    assert 0 < budget.remaining_time() <= 20
+
+
+def test_crawl_invalid_budget(client):
+    for budget in ({"time_budget": 0}, {"max_pages": 0}, {"max_ai_calls": -1}):
+        response = client.post("/crawl", json={"url": "http://example.com", **budget})
+        assert response.status_code == 422
+
+
+def test_crawl_reuses_crawler_extraction(monkeypatch, client):
+    # Pages already extracted by the crawler's early termination policy are not extracted again
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [
+            CrawledPage("http://example.com/", "<html>a@example.com</html>", [{"email": "a@example.com", "context": "a"}]),
+            CrawledPage("http://example.com/b", "<html>b@example.com</html>"),
+        ]
+    )
+    extracted_pages = []
+
+    def fake_extract_emails(html: str):
+        extracted_pages.append(html)
+        return [{"email": "b@example.com", "context": "b"}]
+    monkeypatch.setattr("d_contact_svc.routers.crawler.extract_emails", fake_extract_emails)
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": None} for ctx in contexts]
+    )
+
+    response = client.post("/crawl", json={"url": "http://example.com", "max_emails": 5})
+    assert response.status_code == 200
+    assert [r["email"] for r in response.json()["results"]] == ["a@example.com", "b@example.com"]
+    assert extracted_pages == ["<html>b@example.com</html>"]
+
+
+def test_crawl_store_lookup_failure_falls_back_to_crawling(monkeypatch, client):
+    # E.g. migrations not applied: the lookup fails but the site is still crawled
+    def failing_lookup(db, site, max_age):
+        raise OperationalError("SELECT", {}, Exception("no such table: contacts"))
+    monkeypatch.setattr("d_contact_svc.routers.crawler.find_recent_site_contacts", failing_lookup)
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [CrawledPage("http://example.com/", "<html>x@example.com</html>")]
+    )
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": None} for ctx in contexts]
+    )
+
+    response = client.post("/crawl", json={"url": "http://example.com", "max_age": 3600})
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"email": "x@example.com", "owner_name": None}], "truncated": False}
+
+
+def test_crawl_ai_failure_keeps_stored_owner(monkeypatch, client, db_session):
+    upsert_contacts(db_session, [{"email": "jane.doe@acme.com", "owner": "Jane Doe", "site": "example.com"}])
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.crawl_pages",
+        lambda url, **kwargs: [
+            CrawledPage("http://example.com/", "<html>Write to jane.doe@acme.com today</html>"),
+            CrawledPage("http://example.com/team", "<html>Bob: bob.roe@acme.com</html>"),
+            CrawledPage("http://example.com/bob", "<html>Bob Roe &lt;bob.roe@acme.com&gt;</html>"),
+        ]
+    )
+    monkeypatch.setenv("GPT4O_MINI_API_KEY", "dummy_api_key")
+
+    def failing_post(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("AI service unavailable")
+    monkeypatch.setattr(requests, "post", failing_post)
+
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 200
+    # The response still reports the email as fallback owner, but it is not stored
+    assert response.json()["results"][0] == {"email": "jane.doe@acme.com", "owner_name": "jane.doe@acme.com"}
+
+    db_session.expire_all()
+    owners = {contact.email: contact.owner for contact in db_session.query(Contact)}
+    # A later page naming the owner is not shadowed by an earlier unresolved one
+    assert owners == {"jane.doe@acme.com": "Jane Doe", "bob.roe@acme.com": "Bob Roe"}
+
+
+def test_crawl_truncated_results_not_served_as_fresh(monkeypatch, client):
+    pages = [CrawledPage("http://example.com/", "<html>x@example.com</html>")]
+
+    def fake_crawl(url: str, budget=None, **kwargs):
+        # The site has more pages than a max_pages=1 budget allows
+        budget.take_page() and budget.take_page()
+        return pages
+    monkeypatch.setattr("d_contact_svc.routers.crawler.crawl_pages", fake_crawl)
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": "Owner"} for ctx in contexts]
+    )
+
+    # The page budget runs out, so the crawl is truncated and not recorded as complete
+    response = client.post("/crawl", json={"url": "http://example.com", "max_pages": 1})
+    assert response.json()["truncated"] is True
+
+    # A later lookup crawls again instead of answering the partial results from the store
+    pages.append(CrawledPage("http://example.com/team", "<html>y@example.com</html>"))
+    response = client.post("/crawl", json={"url": "http://example.com", "max_age": 3600})
+    assert response.json() == {
+        "results": [{"email": "x@example.com", "owner_name": "Owner"}, {"email": "y@example.com", "owner_name": "Owner"}],
+        "truncated": False,
+    }
+
+    # That crawl was complete, so it is answered from the store now
+    pages.clear()
+    response = client.post("/crawl", json={"url": "http://example.com", "max_age": 3600})
+    assert [r["email"] for r in response.json()["results"]] == ["x@example.com", "y@example.com"]
+
+
+def test_crawl_stops_when_service_shuts_down(monkeypatch, client):
+    monkeypatch.setattr(budget_module, "_shutdown", threading.Event())
+    fetched = []
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, text):
+            self.text = text
+
+        def raise_for_status(self):
+            pass
+
+    def endless_site_get(url, timeout):
+        fetched.append(url)
+        if url.endswith("robots.txt"):
+            return Response("")
+        # The service starts shutting down while the second page is fetched
+        if len(fetched) == 3:
+            request_shutdown()
+        n = len(fetched)
+        return Response(f"<html>user{n}@example.com <a href='/page{n}'>next</a></html>")
+    monkeypatch.setattr(requests, "get", endless_site_get)
+    monkeypatch.setattr(
+        "d_contact_svc.routers.crawler.identify_email_owners",
+        lambda contexts, **kwargs: [{"email_context": ctx, "owner": None} for ctx in contexts]
+    )
+
+    response = client.post("/crawl", json={"url": "http://example.com"})
+    assert response.status_code == 200
+    # Like a passed deadline, shutdown skips all remaining work and flags the results as partial
+    assert response.json() == {"results": [], "truncated": True}
+    # robots.txt and two pages; the endless site is not crawled further
+    assert len(fetched) == 3
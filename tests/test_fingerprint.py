@@ -0,0 +1,63 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from d_contact_svc import fingerprint
+from d_contact_svc.fingerprint import (
+    SimHashIndex,
+    content_digest,
+    hamming_distance,
+    page_text,
+    simhash,
+)
+
+
+LISTING_TEXT = " ".join(f"product {i} costs {i * 3} dollars and ships fast" for i in range(60))
+
+
+def test_page_text_includes_links():
+    # Link targets are part of the fingerprinted text
+    soup = BeautifulSoup("<html><body>Write to <a href='mailto:a@example.com'>us</a></body></html>", "html.parser")
+    text = page_text(soup)
+    assert "write to us" in text
+    assert "mailto:a@example.com" in text
+
+
+def test_content_digest_exact_match():
+    assert content_digest("same text") == content_digest("same text")
+    assert content_digest("same text") != content_digest("other text")
+
+
+def test_simhash_near_duplicates():
+    # A small change to a large page keeps the fingerprints close
+    near = LISTING_TEXT + " page 2 of 10"
+    assert hamming_distance(simhash(LISTING_TEXT), simhash(near)) <= 3
+
+
+def test_simhash_different_pages():
+    other = " ".join(f"our team member {i} works in office {i} in berlin" for i in range(60))
+    assert hamming_distance(simhash(LISTING_TEXT), simhash(other)) > 3
+
+
+def test_simhash_index_find():
+    index = SimHashIndex(max_distance=3)
+    fingerprint = simhash(LISTING_TEXT)
+    index.add(fingerprint)
+    # Flipping bits within the allowed distance is still found, beyond it is not
+    assert index.find(fingerprint ^ 0b101) == fingerprint
+    assert index.find(fingerprint ^ (1 << 63 | 1 << 40 | 1 << 20 | 1)) is None
+
+
+@pytest.mark.parametrize("max_distance", [0, 3, 7])
+def test_simhash_index_bands_cover_all_bits(max_distance):
+    index = SimHashIndex(max_distance=max_distance)
+    index.add(0)
+    assert index.find((1 << max_distance) - 1) == 0
+    assert index.find((1 << (max_distance + 1)) - 1) is None
+
+
+def test_simhash_large_page_sampled_consistently(monkeypatch):
+    # Pages with more features than MAX_FEATURES are fingerprinted from a consistent sample
+    monkeypatch.setattr(fingerprint, "MAX_FEATURES", 64)
+    large = " ".join(f"item {i} in stock" for i in range(500))
+    assert simhash(large) == simhash(large)
+    assert hamming_distance(simhash(large), simhash(large + " updated today")) <= 3
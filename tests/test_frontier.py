@@ -0,0 +1,59 @@
+from d_contact_svc.frontier import CrawlFrontier, score_url
+
+
+def test_contact_pages_score_higher():
+    site = "example.com"
+    contact = score_url("http://example.com/contact", "Contact us", 1, site)
+    impressum = score_url("http://example.com/impressum", "", 1, site)
+    blog = score_url("http://example.com/blog/2021/05/post", "Read more", 1, site)
+    assert contact > blog
+    assert impressum > blog
+
+
+def test_depth_and_offsite_penalties():
+    site = "example.com"
+    assert score_url("http://example.com/a", depth=1, site=site) > score_url("http://example.com/a", depth=3, site=site)
+    assert score_url("http://example.com/a", site=site) > score_url("http://other.com/a", site=site)
+
+
+def test_frontier_pops_best_first():
+    frontier = CrawlFrontier(site="example.com")
+    frontier.push("http://example.com/blog/post-1", "Post 1", 1)
+    frontier.push("http://example.com/products", "Products", 1)
+    frontier.push("http://example.com/about-us", "About", 1)
+    frontier.push("http://example.com/x", "Get in touch", 1)
+    frontier.push("http://example.com/y", "Contact", 1)
+    order = [frontier.pop()[0] for _ in range(len(frontier))]
+    assert order[:2] == ["http://example.com/y", "http://example.com/about-us"]
+    assert order[-1] == "http://example.com/blog/post-1"
+
+
+def test_frontier_equal_scores_keep_insertion_order():
+    frontier = CrawlFrontier(site="example.com")
+    for name in ["a", "b", "c"]:
+        frontier.push(f"http://example.com/{name}", "", 1)
+    assert [frontier.pop()[0] for _ in range(3)] == [
+        "http://example.com/a", "http://example.com/b", "http://example.com/c"
+    ]
+
+
+def test_frontier_rejects_duplicates_and_non_http():
+    frontier = CrawlFrontier()
+    assert frontier.push("http://example.com/a")
+    assert not frontier.push("http://example.com/a")
+    assert not frontier.push("mailto:info@example.com")
+    assert not frontier.push("javascript:void(0)")
+    assert "http://example.com/a" in frontier
+    assert len(frontier) == 1
+
+
+def test_frontier_returns_depth_and_orders_offsite_last():
+    frontier = CrawlFrontier(site="example.com")
+    frontier.push("http://other.com/contact", "Contact", 2)
+    frontier.push("http://example.com/a", "", 3)
+    frontier.push("http://example.com/deep", "", 1000)
+    assert frontier.pop() == ("http://example.com/a", 3)
+    assert frontier.pop() == ("http://other.com/contact", 2)
+    # Depths beyond the packed range are capped
+    assert frontier.pop() == ("http://example.com/deep", 255)
+    assert len(frontier) == 0
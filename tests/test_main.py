@@ -0,0 +1,31 @@
+import uvicorn
+
+from d_contact_svc import main
+
+
+def test_main_development(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    monkeypatch.setattr(main, "SERVICE_MODE", "development")
+    main.main()
+
+    from d_contact_svc.app import app
+    assert calls == [(app, {"host": main.SERVICE_HOST, "port": int(main.SERVICE_PORT)})]
+
+
+def test_main_production(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **kwargs: calls.append((app, kwargs)))
+    monkeypatch.setattr(main, "SERVICE_MODE", "production")
+    monkeypatch.setattr(main, "WORKERS", 4)
+    monkeypatch.setattr(main, "GRACEFUL_SHUTDOWN_TIMEOUT", 15)
+    # Only uvloop is installed
+    monkeypatch.setattr(main, "_installed", lambda module: module == "uvloop")
+    main.main()
+
+    app, options = calls[0]
+    assert app == "d_contact_svc.app:app"
+    assert options["workers"] == 4
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "h11"
+    assert options["timeout_graceful_shutdown"] == 15
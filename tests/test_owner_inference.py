@@ -0,0 +1,45 @@
+import pytest
+
+from d_contact_svc.owner_inference import infer_owner
+
+
+@pytest.mark.parametrize("context, owner", [
+    ("John Smith <john.smith@acme.com>", "John Smith"),
+    ('"Jane Q. Public" <jane.public@example.org>', "Jane Q. Public"),
+    ('"Jane Q. Public" <jqpublic@example.org>', "Jane Q. Public"),
+    ("John Smith <jsmith@acme.com>", "John Smith"),
+    ("Smith John <john_smith@acme.com>", "Smith John"),
+    ("Email Sales Director Jane Doe <jane.doe@acme.com>", "Jane Doe"),
+    ("Contact John Smith &lt;john.smith@acme.com&gt; today", "John Smith"),
+    ('<a href="mailto:jdoe@acme.com">Jane Doe</a>', "Jane Doe"),
+    ("<a class='x' href='mailto:jane.doe@acme.com?subject=Hi' title='y'> Jane  Doe </a>", "Jane Doe"),
+    ("Questions? info@acme.com", "General Inquiries (acme.com)"),
+    ("Sales+eu@Acme.com", "Sales (acme.com)"),
+])
+def test_resolved_contexts(context, owner):
+    assert infer_owner(context) == owner
+
+
+@pytest.mark.parametrize("context", [
+    # No explicit name
+    "Please contact extracted_email: user@example.com for details.",
+    "test.user+label@domain.co.uk",
+    # Link text is not a name
+    '<a href="mailto:jane@acme.com">Email us</a>',
+    # Name belongs to a different address
+    "John Smith <john@acme.com> or jane@acme.com",
+    # More than one address is ambiguous, even for role accounts
+    "write to info@acme.com or bob@acme.com",
+    # Single word names are not trusted
+    "Jane <jane@acme.com>",
+    # Title-case text that does not spell the mailbox name
+    '<a href="mailto:jane@acme.com">Get In Touch</a>',
+    "Please Reply To <jane@acme.com>",
+    "Abuse Reports Desk <abuse@acme.com>",
+    "Email Sales Director Jane Doe <jane@acme.com>",
+    "Copyright 2024 Acme Corp <jane@acme.com>",
+    "John Smith <jane.doe@acme.com>",
+    "No email at all",
+])
+def test_unresolved_contexts(context):
+    assert infer_owner(context) is None
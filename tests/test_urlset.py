@@ -0,0 +1,34 @@
+from d_contact_svc.urlset import URLFingerprintSet, url_fingerprint
+
+
+def test_add_and_contains():
+    urls = URLFingerprintSet()
+    assert urls.add("http://example.com/a")
+    assert not urls.add("http://example.com/a")
+    assert "http://example.com/a" in urls
+    assert "http://example.com/b" not in urls
+    assert len(urls) == 1
+
+
+def test_grows_beyond_initial_capacity():
+    urls = URLFingerprintSet(capacity=4)
+    initial_size = urls.nbytes
+    for i in range(10000):
+        assert urls.add(f"http://example.com/page/{i}")
+    assert len(urls) == 10000
+    assert urls.nbytes > initial_size
+    assert all(f"http://example.com/page/{i}" in urls for i in range(10000))
+    assert "http://example.com/page/10000" not in urls
+
+
+def test_fingerprint_is_never_zero():
+    assert url_fingerprint("") != 0
+    assert url_fingerprint("http://example.com/") == url_fingerprint("http://example.com/")
+
+
+def test_memory_per_url_is_bounded():
+    urls = URLFingerprintSet()
+    for i in range(50000):
+        urls.add(f"http://shop.example.com/category/{i % 50}/product/{i}?color=blue&size=m")
+    # At most 8 bytes per slot with the table at least 30% full after growing
+    assert urls.nbytes / len(urls) <= 8 / 0.3